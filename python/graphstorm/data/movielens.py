@@ -26,7 +26,7 @@ from transformers import AutoTokenizer
 
 from .dataset import GSgnnDataset
 from .utils import parse_category_single_feat
-from .utils import get_id
+from .utils import get_ids_batch
 
 class MovieLens100kNCDataset(GSgnnDataset):
     """r Movielens dataset for node classification
@@ -124,11 +124,8 @@ class MovieLens100kNCDataset(GSgnnDataset):
                 occupation.append(line[3])
 
             # encode user id
-            unids = []
             unid_map = {}
-            for node in user_ids:
-                unid, _ = get_id(unid_map, node)
-                unids.append(unid)
+            unids, _ = get_ids_batch(unid_map, user_ids)
             unids = th.tensor(unids, dtype=th.int64)
 
             age = th.tensor(age, dtype=th.float32)
@@ -174,11 +171,8 @@ class MovieLens100kNCDataset(GSgnnDataset):
                 movie_labels.append([int(l) for l in line[5:]])
 
             # encode user id
-            inids = []
             inid_map = {}
-            for node in movie_ids:
-                inid, _ = get_id(inid_map, node)
-                inids.append(inid)
+            inids, _ = get_ids_batch(inid_map, movie_ids)
             inids = th.tensor(inids, dtype=th.int64)
 
             # title feature
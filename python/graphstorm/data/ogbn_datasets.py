@@ -22,6 +22,7 @@ import torch as th
 import psutil
 
 from .text_dataset import GSgnnTextDataset
+from .utils import read_text_lines
 
 class OGBTextFeatDataset(GSgnnTextDataset):
     """ This class can be used for ogbn-arxiv, ogbn-papers100M and ogbn-products datasets.
@@ -125,9 +126,7 @@ class OGBTextFeatDataset(GSgnnTextDataset):
         # If we don't retain the original node features, we use text tokens as node features.
         if not self.retain_original_features:
             # this file contains the text data each line corresponds to a node id
-            with open(os.path.join(self._raw_dir, "X.all.txt"),
-                      "r", encoding='utf-8') as fin:
-                text_feats_list = fin.readlines()
+            text_feats_list = read_text_lines(os.path.join(self._raw_dir, "X.all.txt"))
             assert len(text_feats_list) == data.graph[0].num_nodes()
             print("|node_text_list={}".format(len(text_feats_list)))
 
@@ -15,11 +15,43 @@
 
     Utility functions for dataset and data processing
 """
+import mmap
+import os
+from functools import lru_cache
+
 import numpy as np
+import pandas as pd
 import torch as th
 import torch.distributed as dist
 
-from sklearn.preprocessing import LabelBinarizer
+def read_text_lines(path, encoding='utf-8'):
+    """ Read all the lines of a text file.
+
+    The file is memory-mapped and read line by line, so the content of the file
+    is never copied into memory as a whole besides the returned lines.
+    Line breaks are not included in the returned lines.
+
+    Parameters
+    ----------
+    path : str
+        The path of the text file.
+    encoding : str
+        The encoding of the text file. If None, the lines are returned as bytes.
+
+    Returns
+    -------
+    list : the lines of the file.
+    """
+    if os.path.getsize(path) == 0:
+        # mmap cannot map an empty file.
+        return []
+    with open(path, 'rb') as fin, \
+        mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = []
+        for line in iter(mm.readline, b""):
+            line = line.rstrip(b"\r\n")
+            lines.append(line if encoding is None else line.decode(encoding))
+    return lines
 
 def get_id(nid_dict, key):
     """ Convert Raw node id into integer ids.
@@ -39,6 +71,45 @@ def get_id(nid_dict, key):
         nid_dict[key] = nid
     return nid, is_new
 
+def get_ids_batch(nid_dict, keys):
+    """ Convert a batch of raw node ids into integer ids.
+
+    This is the batched version of `get_id`. It assigns the same integer ids
+    as calling `get_id` on each key in order, but only looks up each distinct
+    key in `nid_dict` once.
+
+    Parameters
+    ----------
+    nid_dict : dict
+        Raw node id to integer id mapping. New raw node ids are added to it.
+    keys : list or numpy.array
+        Raw node ids
+
+    Returns
+    -------
+    numpy.array : the integer ids of the keys.
+    numpy.array : a boolean mask of the keys that are added to `nid_dict`
+    for the first time.
+    """
+    # The keys are hashed as Python objects. A Numpy string array would
+    # pad every key to the length of the longest one.
+    # The unique keys are returned in the order they first appear in the batch.
+    inverse, uniq_keys = pd.factorize(np.asarray(keys, dtype=object))
+    _, first_idx = np.unique(inverse, return_index=True)
+    uniq_ids = np.empty(len(uniq_keys), dtype=np.int64)
+    uniq_is_new = np.zeros(len(uniq_keys), dtype=bool)
+    for i, key in enumerate(uniq_keys):
+        nid = nid_dict.get(key, None)
+        if nid is None:
+            nid = len(nid_dict)
+            nid_dict[key] = nid
+            uniq_is_new[i] = True
+        uniq_ids[i] = nid
+
+    is_new = np.zeros(len(inverse), dtype=bool)
+    is_new[first_idx[uniq_is_new]] = True
+    return uniq_ids[inverse], is_new
+
 def reverse_etype(etype):
     """Add reversed edges for the given edge type.
        If the given edge type is a canonical type, use the first and second elements as edge
@@ -56,17 +127,32 @@ def return_reverse_mappings(etypes, g):
     original edge id. This is a result of the add_reverse_edges() function of the data
     utils files.
     """
-    reverse_eids = {g.to_canonical_etype(etype): th.arange(g.number_of_edges(etype)) \
-                    for etype in etypes}
+    num_edges = {g.to_canonical_etype(etype): g.number_of_edges(etype) for etype in etypes}
+    # All the edge types share the storage of a single arange.
+    base = th.arange(max(num_edges.values(), default=0))
+    reverse_eids = {etype: base[:num] for etype, num in num_edges.items()}
     return reverse_eids
 
 def add_reverse_edges(graph_edges):
     """Add reverse edge for all edge types.
+
+    Parameters
+    ----------
+    graph_edges : dict
+        The edges of each edge type, stored either as a tuple of
+        (src, dst) or as a (2, E) tensor/array.
+
+    Returns
+    -------
+    dict : the edges of the original and reversed edge types. The reversed
+    edges are (dst, src) tuples of views of the original edges, so no edge
+    data is copied.
     """
-    new_graph_edges = {}
-    for etype, edges in graph_edges.items():
-        new_graph_edges[etype] = edges
-        new_graph_edges[reverse_etype(etype)] = (edges[1], edges[0])
+    new_graph_edges = dict(graph_edges)
+    # Indexing the rows of a (2, E) tensor/array returns views. torch.flip
+    # would copy the whole edge array instead.
+    new_graph_edges.update({reverse_etype(etype): (edges[1], edges[0]) \
+                            for etype, edges in graph_edges.items()})
     return new_graph_edges
 
 def adjust_eval_mapping_for_partition(original_idx, original_eval_idx, original_eval_text):
@@ -82,9 +168,18 @@ def adjust_eval_mapping_for_partition(original_idx, original_eval_idx, original_
     original_eval_idx = np.array(original_eval_idx)
     original_idx= original_idx[0:len(original_idx)]
     original_idx= original_idx.cpu().numpy()
-    _, x_ind, y_ind =np.intersect1d(original_idx, original_eval_idx, \
-                                    assume_unique=True, return_indices=True)
-    # xy are the common and unique elements
+    # Binary search the eval idx in the sorted original idx instead of
+    # using np.intersect1d, which sorts the concatenation of both arrays.
+    sort_order = np.argsort(original_idx, kind='stable')
+    sorted_idx = original_idx[sort_order]
+    pos = np.searchsorted(sorted_idx, original_eval_idx)
+    pos[pos == len(sorted_idx)] = 0
+    valid = sorted_idx[pos] == original_eval_idx if len(sorted_idx) > 0 \
+        else np.zeros(len(original_eval_idx), dtype=bool)
+    y_ind = np.nonzero(valid)[0]
+    # Keep the output ordered by the common elements as np.intersect1d does.
+    y_ind = y_ind[np.argsort(original_eval_idx[y_ind], kind='stable')]
+    x_ind = sort_order[pos[y_ind]]
 
     # x_ind is the index of the common entries in the original_idx
     # essentially this index is the node idx in the distgraph
@@ -126,8 +221,12 @@ def parse_category_single_feat(category_inputs, classes=None):
 
     Note
     ----
-    sklearn.preprocessing.LabelBinarizer is used to convert
-    categorical features into a onehot encoding format.
+    Categories are mapped to their positions in the sorted class list and
+    the onehot encoding is gathered from an identity matrix in one shot.
+    Inputs that do not appear in `classes` are encoded as all-zero rows.
+    If there are at most two classes, the onehot encoding always has two
+    columns. In this case, if the inputs have at most two distinct values,
+    unseen inputs are encoded as the first class, as LabelBinarizer does.
 
     Return
     ------
@@ -145,31 +244,84 @@ def parse_category_single_feat(category_inputs, classes=None):
         array([[1.,0.,0.],[0.,1.,0.],[0.,0.,1.],[1.,0.,0.]])
 
     """
+    category_inputs = np.asarray(category_inputs)
     if classes is not None:
-        lb = LabelBinarizer()
-        lb.fit(classes)
-        feat = lb.transform(category_inputs)
+        # The predefined class list is usually the same across calls,
+        # so only the sorted class list is cached.
+        classes = _sorted_classes(tuple(classes)).copy()
+        cat_idx = np.searchsorted(classes, category_inputs)
+        # searchsorted returns len(classes) for inputs larger than every class.
+        cat_idx[cat_idx == len(classes)] = 0
+        valid = classes[cat_idx] == category_inputs
     else:
-        lb = LabelBinarizer()
-        feat = lb.fit_transform(category_inputs)
+        classes, cat_idx = np.unique(category_inputs, return_inverse=True)
+        valid = None
+
+    if len(classes) <= 2 and (valid is None or len(np.unique(category_inputs)) <= 2):
+        # A binary encoding only tells the second class apart. Any other
+        # input, including an unseen one, falls into the first column.
+        if valid is not None:
+            cat_idx[~valid] = 0
+        feat = np.eye(2, dtype=np.float32)[cat_idx]
+    elif len(classes) == 1:
+        # The inputs of the only class fall into the second column.
+        feat = np.eye(2, dtype=np.float32)[valid.astype(np.int64)]
+    else:
+        feat = np.eye(len(classes), dtype=np.float32)[cat_idx]
+        if valid is not None:
+            feat[~valid] = 0.
 
-    # if there are only 2 catebories,
-    # fit_transform only create a array of [0, 1, ...]
-    if feat.shape[1] == 1:
-        f = np.zeros((feat.shape[0], 2))
-        f[range(f.shape[0]),feat.squeeze()] = 1.
-        feat = f
+    return feat, classes
 
-    return feat, lb.classes_
+@lru_cache(maxsize=32)
+def _sorted_classes(classes):
+    """ Sort and deduplicate the predefined class list.
 
+    Parameters
+    ----------
+    classes : tuple
+        predefined class list
+
+    Return
+    ------
+    numpy.array : the sorted unique classes.
+    """
+    classes = np.unique(classes)
+    classes.flags.writeable = False
+    return classes
 
 def generated_train_valid_test_splits(g, train_pct, valid_pct, test_pct,
-                                      use_non_selected_edges=False, seed=None):
+                                      use_non_selected_edges=False, seed=None,
+                                      need_masks=True, share_memory=False):
     """Generate the train/validation/test splits
+
+    Parameters
+    ----------
+    g : DGLGraph
+        The graph whose edges are split.
+    train_pct : float
+        The percentage of edges used for training.
+    valid_pct : float
+        The percentage of edges used for validation.
+    test_pct : float
+        The percentage of edges used for testing.
+    use_non_selected_edges : bool
+        Whether the edge masks include the edges that are not selected by any split.
+    seed : int
+        The random seed.
+    need_masks : bool
+        Whether to construct the boolean edge masks. If False, the returned
+        mask dicts are empty.
+    share_memory : bool
+        Whether to place the edge splits and masks in shared memory. The splits
+        are views of a single shared permutation per edge type, so they can be
+        passed to worker processes without being copied.
     """
-    # Use seed to ensure consistent train split
-    if seed is not None:
-        th.manual_seed(seed)
+    # Use seed to ensure consistent train split. Without a seed, the splits
+    # follow the global random state of Pytorch, e.g., set by th.manual_seed.
+    rng = np.random.default_rng(seed) if seed is not None else None
+    train_valid_pct = train_pct + valid_pct
+    total_pct = train_valid_pct + test_pct
 
     train_eids = {}
     val_eids = {}
@@ -179,34 +331,39 @@ def generated_train_valid_test_splits(g, train_pct, valid_pct, test_pct,
     test_graph_mask_dic = {}
     for etype in g.canonical_etypes:
         number_edges_etype = g.number_of_edges(etype)
-        edge_ids = th.randperm(number_edges_etype)
-
-        train_eids[etype] = edge_ids[:int(train_pct*number_edges_etype)]
-        val_eids[etype] = edge_ids[int(train_pct*number_edges_etype):
-                                   int((train_pct+valid_pct)*number_edges_etype)]
-        test_eids[etype] = edge_ids[int((train_pct+valid_pct)*number_edges_etype):
-                                    int((train_pct+valid_pct+test_pct)*number_edges_etype)]
-
-        if use_non_selected_edges:
-            train_graph_mask = th.ones(number_edges_etype)
-            train_graph_mask[val_eids[etype]] = 0
-            train_graph_mask[test_eids[etype]] = 0
-            val_graph_mask = th.ones(number_edges_etype)
-            val_graph_mask[test_eids[etype]] = 0
-            test_graph_mask = th.ones(number_edges_etype)
-        else:
-            train_graph_mask = th.zeros(number_edges_etype)
-            train_graph_mask[train_eids[etype]] = 1
-            val_graph_mask = th.zeros(number_edges_etype)
-            val_graph_mask[train_eids[etype]] = 1
-            val_graph_mask[val_eids[etype]] = 1
-            test_graph_mask = th.zeros(number_edges_etype)
-            test_graph_mask[train_eids[etype]] = 1
-            test_graph_mask[val_eids[etype]] = 1
-            test_graph_mask[test_eids[etype]] = 1
-        train_graph_mask_dic[etype]=train_graph_mask
-        val_graph_mask_dic[etype] = val_graph_mask
-        test_graph_mask_dic[etype] = test_graph_mask
+        edge_ids = th.from_numpy(rng.permutation(number_edges_etype)) \
+                if rng is not None else th.randperm(number_edges_etype)
+        if share_memory:
+            edge_ids.share_memory_()
+        train_end = int(train_pct*number_edges_etype)
+        val_end = int(train_valid_pct*number_edges_etype)
+        test_end = int(total_pct*number_edges_etype)
+
+        train_eids[etype] = edge_ids[:train_end]
+        val_eids[etype] = edge_ids[train_end:val_end]
+        test_eids[etype] = edge_ids[val_end:test_end]
+
+        if need_masks:
+            # Each mask is derived from the mask of the neighbouring split,
+            # so every mask only fills the edges of one split.
+            if use_non_selected_edges:
+                # Everything except the edges of the later splits.
+                test_graph_mask = th.ones(number_edges_etype, dtype=th.bool)
+                val_graph_mask = test_graph_mask.clone().index_fill_(0, test_eids[etype], False)
+                train_graph_mask = val_graph_mask.clone().index_fill_(0, val_eids[etype], False)
+            else:
+                # Each mask covers its own split and all the previous splits.
+                train_graph_mask = th.zeros(number_edges_etype, dtype=th.bool)
+                train_graph_mask.index_fill_(0, train_eids[etype], True)
+                val_graph_mask = train_graph_mask.clone().index_fill_(0, val_eids[etype], True)
+                test_graph_mask = val_graph_mask.clone().index_fill_(0, test_eids[etype], True)
+            if share_memory:
+                train_graph_mask.share_memory_()
+                val_graph_mask.share_memory_()
+                test_graph_mask.share_memory_()
+            train_graph_mask_dic[etype] = train_graph_mask
+            val_graph_mask_dic[etype] = val_graph_mask
+            test_graph_mask_dic[etype] = test_graph_mask
 
         print('Edge type : {}: |train|={}, |val|={}, |test|={}'.format(str(etype),
                                                                        len(train_eids[etype]),
@@ -216,7 +373,8 @@ def generated_train_valid_test_splits(g, train_pct, valid_pct, test_pct,
     return train_eids, val_eids, test_eids, \
            train_graph_mask_dic, val_graph_mask_dic, test_graph_mask_dic
 
-def alltoall_cpu(rank, world_size, output_tensor_list, input_tensor_list):
+def alltoall_cpu(rank, world_size, # pylint: disable=unused-argument
+                 output_tensor_list, input_tensor_list):
     """ Each process scatters list of input tensors to all processes in a cluster
     and return gathered list of tensors in output list. The tensors should have the same shape.
     Parameters
@@ -230,9 +388,15 @@ def alltoall_cpu(rank, world_size, output_tensor_list, input_tensor_list):
     input_tensor_list : List of tensor
         The tensors to exchange
     """
-    input_tensor_list = [tensor.to(th.device('cpu')) for tensor in input_tensor_list]
-    for i in range(world_size):
-        dist.scatter(output_tensor_list[i], input_tensor_list if i == rank else None, src=i)
+    assert len(input_tensor_list) == world_size
+    # gloo does not support the list based all_to_all. As all the tensors
+    # have the same shape, stack them and exchange them with a single
+    # all_to_all_single instead of world_size rounds of scatter.
+    input_buf = th.stack([tensor.to(th.device('cpu')) for tensor in input_tensor_list])
+    output_buf = th.empty_like(input_buf)
+    dist.all_to_all_single(output_buf, input_buf)
+    for output_tensor, recv_tensor in zip(output_tensor_list, output_buf):
+        output_tensor.copy_(recv_tensor)
 
 def alltoallv_cpu(rank, world_size, output_tensor_list, input_tensor_list):
     """Each process scatters list of input tensors to all processes in a cluster
@@ -251,14 +415,15 @@ def alltoallv_cpu(rank, world_size, output_tensor_list, input_tensor_list):
     input_tensor_list : List of tensor
         The tensors to exchange
     """
+    input_tensor_list = _stage_to_cpu(input_tensor_list)
     # send tensor to each target trainer using torch.distributed.isend
     # isend is async
     senders = []
     for i in range(world_size):
         if i == rank:
-            output_tensor_list[i] = input_tensor_list[i].to(th.device('cpu'))
+            output_tensor_list[i] = input_tensor_list[i]
         else:
-            sender = dist.isend(input_tensor_list[i].to(th.device('cpu')), dst=i)
+            sender = dist.isend(input_tensor_list[i], dst=i)
             senders.append(sender)
 
     for i in range(world_size):
@@ -267,7 +432,44 @@ def alltoallv_cpu(rank, world_size, output_tensor_list, input_tensor_list):
 
     th.distributed.barrier()
 
-def alltoallv_nccl(rank, world_size, output_tensor_list, input_tensor_list):
+def _stage_to_cpu(tensor_list):
+    """ Copy a list of tensors to CPU through one contiguous staging buffer.
+
+    Tensors on GPU are packed into a single pinned CPU buffer so that
+    the device to host transfer is issued once instead of once per tensor.
+    The returned tensors are views of the staging buffer.
+
+    Parameters
+    ----------
+    tensor_list : List of tensor
+        The tensors to copy. They should share the same dtype.
+
+    Returns
+    -------
+    List of tensor: the tensors on CPU.
+    """
+    if all(not tensor.is_cuda for tensor in tensor_list):
+        return tensor_list
+
+    dtype = tensor_list[0].dtype
+    assert all(tensor.dtype == dtype for tensor in tensor_list), \
+        "All the tensors to exchange should have the same dtype."
+    total_numel = sum(tensor.numel() for tensor in tensor_list)
+    staging = th.empty((total_numel,), dtype=dtype, pin_memory=True)
+    cpu_tensors = []
+    offset = 0
+    for tensor in tensor_list:
+        numel = tensor.numel()
+        buf = staging[offset:offset+numel].view(tensor.shape)
+        buf.copy_(tensor, non_blocking=True)
+        cpu_tensors.append(buf)
+        offset += numel
+    # Wait for the async copies before the buffer is read by gloo.
+    th.cuda.synchronize()
+    return cpu_tensors
+
+def alltoallv_nccl(rank, world_size, # pylint: disable=unused-argument
+                   output_tensor_list, input_tensor_list):
     """Each process scatters list of input tensors to all processes in a cluster
     and return gathered list of tensors in output list.
 
@@ -284,21 +486,12 @@ def alltoallv_nccl(rank, world_size, output_tensor_list, input_tensor_list):
     input_tensor_list : List of tensor
         The tensors to exchange
     """
-    # send tensor to each target trainer using torch.distributed.isend
-    # isend is async
-    senders = []
-    for i in range(world_size):
-        if i == rank:
-            output_tensor_list[i] = input_tensor_list[i]
-        else:
-            sender = dist.isend(input_tensor_list[i], dst=i)
-            senders.append(sender)
-
-    for i in range(world_size):
-        if i != rank:
-            dist.recv(output_tensor_list[i], src=i)
-
-    th.distributed.barrier()
+    # Exchange the tensors with a single all_to_all collective instead of
+    # per-rank isend/recv. The tensors are not packed into one buffer, so
+    # a tensor sent to several ranks is not copied, and the received tensors
+    # are written into the tensors of output_tensor_list.
+    assert len(input_tensor_list) == world_size
+    dist.all_to_all(output_tensor_list, input_tensor_list)
 
 def all_reduce_sum(tensor):
     """Use a specific dist.all_reduce function
@@ -16,6 +16,7 @@
     Various datasets for the GSF
 """
 import abc
+import functools
 import torch as th
 import dgl
 
@@ -63,9 +64,18 @@ def prepare_batch_input(g, input_nodes,
             else feat_field[ntype] if ntype in feat_field else None
 
         if feat_name is not None:
-            # concatenate multiple features together
-            feat[ntype] = th.cat([g.nodes[ntype].data[fname][nid].to(dev) \
-                for fname in feat_name], dim=1)
+            feats = [g.nodes[ntype].data[fname][nid] for fname in feat_name]
+            if th.device(dev).type == 'cuda' and not any(f.is_cuda for f in feats):
+                # Concatenate the features in pinned memory, so that they are moved
+                # to GPU with one asynchronous copy. The pinned buffers are recycled
+                # by the caching host allocator of PyTorch.
+                dtype = functools.reduce(th.promote_types, [f.dtype for f in feats])
+                buf = th.empty((len(feats[0]), sum(f.shape[1] for f in feats)),
+                               dtype=dtype, pin_memory=True)
+                feat[ntype] = th.cat(feats, dim=1, out=buf).to(dev, non_blocking=True)
+            else:
+                # concatenate multiple features together
+                feat[ntype] = th.cat([f.to(dev) for f in feats], dim=1)
     return feat
 
 class GSgnnData():
@@ -34,7 +34,7 @@ from .file_io import get_in_files, write_data_parquet
 from .file_io import HDF5Array
 from .transform import parse_feat_ops, process_features
 from .transform import parse_label_ops, process_labels
-from .transform import do_multiprocess_transform
+from .transform import do_multiprocess_transform, do_multithread_read
 from .id_map import NoopMap, IdMap, map_node_ids
 from .utils import multiprocessing_data_read, ExtMemArrayMerger, partition_graph
 
@@ -116,6 +116,33 @@ def parse_edge_data(in_file, feat_ops, label_ops, node_id_map, read_file,
                                     skip_nonexist_edges)
     return (src_ids, dst_ids, feat_data)
 
+def _is_sequential_ids(ids, chunk_size=1024 * 1024):
+    """ Test whether the integer IDs are 0, 1, ..., N - 1.
+
+    The IDs are compared chunk by chunk, so that we don't need to allocate
+    another array of the same size and we can stop at the first mismatch.
+
+    Parameters
+    ----------
+    ids : Numpy array
+        The integer IDs.
+    chunk_size : int
+        The number of IDs to compare at a time.
+
+    Returns
+    -------
+    bool : whether the IDs are in sequence starting from 0.
+    """
+    if len(ids) == 0:
+        return True
+    if ids[0] != 0 or ids[-1] != len(ids) - 1:
+        return False
+    for start in range(0, len(ids), chunk_size):
+        end = min(start + chunk_size, len(ids))
+        if not np.array_equal(ids[start:end], np.arange(start, end)):
+            return False
+    return True
+
 def process_node_data(process_confs, arr_merger, remap_id, num_processes=1):
     """ Process node data
 
@@ -187,7 +214,9 @@ def process_node_data(process_confs, arr_merger, remap_id, num_processes=1):
                               read_file=read_file)
         start = time.time()
         num_proc = num_processes if multiprocessing else 0
-        return_dict = multiprocessing_data_read(in_files, num_proc, user_parser)
+        return_dict = multiprocessing_data_read(in_files, num_proc, user_parser,
+                                                use_threads=do_multithread_read(process_conf,
+                                                                                feat_ops))
         dur = time.time() - start
         print(f"Processing data files for node {node_type} takes {dur:.3f} seconds.")
 
@@ -222,9 +251,9 @@ def process_node_data(process_confs, arr_merger, remap_id, num_processes=1):
         # all node Ids are in sequence start from 0 and
         # the user doesn't force to remap node IDs.
         if type_node_id_map is not None \
+                and not remap_id \
                 and np.issubdtype(type_node_id_map.dtype, np.integer) \
-                and np.all(type_node_id_map == np.arange(len(type_node_id_map))) \
-                and not remap_id:
+                and _is_sequential_ids(type_node_id_map):
             type_node_id_map = NoopMap(len(type_node_id_map))
         elif type_node_id_map is not None:
             type_node_id_map = IdMap(type_node_id_map)
@@ -343,7 +372,9 @@ def process_edge_data(process_confs, node_id_map, arr_merger,
                               skip_nonexist_edges=skip_nonexist_edges)
         start = time.time()
         num_proc = num_processes if multiprocessing else 0
-        return_dict = multiprocessing_data_read(in_files, num_proc, user_parser)
+        return_dict = multiprocessing_data_read(in_files, num_proc, user_parser,
+                                                use_threads=do_multithread_read(process_conf,
+                                                                                feat_ops))
         dur = time.time() - start
         print(f"Processing data files for edges of {edge_type} takes {dur:.3f} seconds")
 
@@ -441,18 +472,20 @@ def process_graph(args):
                         save_mapping=True, # always save mapping
                         part_method=args.part_method)
     elif args.output_format == "DGL":
+        # The merged arrays are shared with the tensors instead of being copied.
+        # If they are stored in external memory, the tensors are backed by the files.
         for ntype in node_data:
             for name, ndata in node_data[ntype].items():
                 if isinstance(ndata, HDF5Array):
                     g.nodes[ntype].data[name] = ndata.to_tensor()
                 else:
-                    g.nodes[ntype].data[name] = th.tensor(ndata)
+                    g.nodes[ntype].data[name] = th.as_tensor(ndata)
         for etype in edge_data:
             for name, edata in edge_data[etype].items():
                 if isinstance(edata, HDF5Array):
                     g.edges[etype].data[name] = edata.to_tensor()
                 else:
-                    g.edges[etype].data[name] = th.tensor(edata)
+                    g.edges[etype].data[name] = th.as_tensor(edata)
         dgl.save_graphs(os.path.join(args.output_dir, args.graph_name + ".dgl"), [g])
     else:
         raise ValueError('Unknown output format: {}'.format(args.output_format))
@@ -23,14 +23,9 @@ import os
 
 import pyarrow.parquet as pq
 import pyarrow as pa
-import pandas as pd
 import numpy as np
 import torch as th
 import h5py
-from typing import Dict
-
-def astype_inplace(df: pd.DataFrame, dct: Dict):
-    df[list(dct.keys())] = df.astype(dct)[list(dct.keys())]
 
 def read_data_json(data_file, data_fields):
     """ Read data from a JSON file.
@@ -51,10 +46,7 @@ def read_data_json(data_file, data_fields):
     dict : map from data name to data
     """
     with open(data_file, 'r', encoding="utf8") as json_file:
-        data_records = []
-        for line in json_file.readlines():
-            record = json.loads(line)
-            data_records.append(record)
+        data_records = [json.loads(line) for line in json_file]
 
     data = {key: [] for key in data_fields}
     for record in data_records:
@@ -81,102 +73,149 @@ def write_data_json(data, data_file):
             for i, val in enumerate(data[key]):
                 records[i][key] = val.tolist()
     with open(data_file, 'w', encoding="utf8") as json_file:
-        for record in records:
-            record = json.dumps(record)
-            json_file.write(record + "\n")
+        # Hand all records to the file object at once instead of issuing
+        # a write call per record.
+        json_file.writelines(json.dumps(record) + "\n" for record in records)
 
-def read_data_parquet(data_file, data_fields=None):
-    """ Read data from a parquet file.
+def _parquet_column_to_numpy(col):
+    """ Convert a column of a parquet table to a Numpy array.
 
-    A row of a multi-dimension data is stored as an object in Parquet.
-    We need to stack them to form a tensor.
+    A row of a multi-dimension data is stored as a list in Parquet.
+    If all the lists have the same length, we read the flattened values
+    and reshape them to form a tensor without going through Python objects.
+    A dictionary-encoded column is converted by creating a Python object for
+    each distinct value only and gathering them with the dictionary indices.
 
     Parameters
     ----------
-    data_file : str
-        The parquet file that contains the data
-    data_fields : list of str
-        The data fields to read from the data file.
+    col : pyarrow.Array or pyarrow.ChunkedArray
+        The column of a parquet table or a record batch.
 
     Returns
     -------
-    dict : map from data name to data.
+    Numpy array : the data of the column.
     """
-    table = pq.read_table(data_file)
-    data = {}
-    df_table = table.to_pandas()
-    if data_fields is None:
-        data_fields = list(df_table.keys())
-    for key in data_fields:
-        assert key in df_table, f"The data field {key} does not exist in {data_file}."
-        val = df_table[key]
-        d = np.array(val)
-        # For multi-dimension arrays, we split them by rows and
-        # save them as objects in parquet. We need to merge them
-        # together and store them in a tensor.
-        if d.dtype.hasobject and isinstance(d[0], np.ndarray):
-            d = [d[i] for i in range(len(d))]
-            d = np.stack(d)
-        data[key] = d
-    return data
-
-def read_data_parquet(data_file, data_fields=None):
+    if isinstance(col, pa.ChunkedArray):
+        col = col.combine_chunks()
+    if pa.types.is_dictionary(col.type):
+        if col.null_count == 0:
+            return col.dictionary.to_numpy(zero_copy_only=False)[col.indices.to_numpy()]
+        col = col.dictionary_decode()
+    if pa.types.is_fixed_size_list(col.type) and col.null_count == 0:
+        return col.flatten().to_numpy(zero_copy_only=False).reshape(len(col), -1)
+    if (pa.types.is_list(col.type) or pa.types.is_large_list(col.type)) \
+            and col.null_count == 0 and len(col) > 0:
+        lens = np.diff(col.offsets.to_numpy())
+        if np.all(lens == lens[0]):
+            return col.flatten().to_numpy(zero_copy_only=False).reshape(len(col), lens[0])
+    d = col.to_numpy(zero_copy_only=False)
+    # Otherwise, the rows are read as objects and we need to stack them.
+    if d.dtype.hasobject and len(d) > 0 and isinstance(d[0], np.ndarray):
+        d = np.stack(d)
+    return d
+
+def read_data_parquet(data_file, data_fields=None, batch_size=65536):
     """ Read data from a parquet file.
 
     A row of a multi-dimension data is stored as an object in Parquet.
     We need to stack them to form a tensor.
 
+    Only the columns of the data fields are read and decoded from the file.
+    The file is read in batches of rows, and each batch is converted from Arrow
+    to Numpy and copied to the preallocated output arrays, so the whole file
+    is never held as an Arrow table and a Pandas dataframe is never created.
+
     Parameters
     ----------
     data_file : str
         The parquet file that contains the data
     data_fields : list of str
         The data fields to read from the data file.
+    batch_size : int
+        The number of rows that are read from the file at a time.
 
     Returns
     -------
     dict : map from data name to data.
     """
-    table = pq.read_table(data_file)
-    data = {}
-    df_table = table.to_pandas()
-
-    df_columns = df_table.columns
-    if "supply_index" in df_columns:
-        if "feats" in df_table.columns:
-            df_table["feats"] = df_table['feats'].apply(np.float16)
-
-    mapping_dict = {}
-    remap = False
-    for index, dtype in df_table.dtypes.items():
+    pq_file = pq.ParquetFile(data_file)
+    # The schema is stored in the file footer, so we can check the columns
+    # without reading any data.
+    schema = pq_file.schema_arrow
+    columns = schema.names
+    # The supply data store their features in float16.
+    to_float16 = "supply_index" in columns and "feats" in columns
+    if data_fields is None:
+        data_fields = columns
+    for key in data_fields:
+        assert key in columns, f"The data field {key} does not exist in {data_file}."
+    # A column may be used by multiple data fields, but it only needs to be read once.
+    data_fields = list(dict.fromkeys(data_fields))
+    # String columns (e.g., node IDs) often contain many duplicated values.
+    # We read them with dictionary encoding, so that only the distinct strings
+    # are decoded and converted to Python objects.
+    str_fields = [key for key in data_fields
+                  if pa.types.is_string(schema.field(key).type)
+                  or pa.types.is_large_string(schema.field(key).type)]
+    if len(str_fields) > 0:
+        pq_file = pq.ParquetFile(data_file, read_dictionary=str_fields)
+
+    def _convert(col, key):
+        d = _parquet_column_to_numpy(col)
+        # Masks only contain 0 and 1.
+        if key.endswith("_mask"):
+            d = d.astype(np.int8)
+        if to_float16:
+            d = d.astype(np.float16)
+        return d
+
+    num_rows = pq_file.metadata.num_rows
+    if num_rows == 0:
+        table = pq_file.read(columns=data_fields)
+        return {key: _convert(table.column(key), key) for key in data_fields}
 
-        #if(dtype == "float32"):
-        #    mapping_dict[index] = "float16"
+    data = {}
+    row_idx = 0
+    for batch in pq_file.iter_batches(batch_size=batch_size, columns=data_fields):
+        for key in data_fields:
+            d = _convert(batch.column(key), key)
+            if key not in data:
+                data[key] = np.empty((num_rows,) + d.shape[1:], dtype=d.dtype)
+            elif data[key].dtype != d.dtype:
+                # A batch may need a wider data type than the previous batches,
+                # e.g., an integer column with missing values is read as floats.
+                data[key] = data[key].astype(np.result_type(data[key].dtype, d.dtype))
+            data[key][row_idx:(row_idx + len(d))] = d
+        row_idx += batch.num_rows
+    return data
 
-        if(index.endswith("_mask")):
-            mapping_dict[index] = "int8"
-            remap = True
+def write_data_parquet(data, data_file):
+    """ Write data into a Parquet file.
 
-    if(remap):
-        astype_inplace(df_table, mapping_dict)
+    A Parquet column stores a vector. A matrix is stored as a column of
+    fixed-size lists, one list per row, which `read_data_parquet` converts
+    back to a matrix.
 
-    if data_fields is None:
-        data_fields = list(df_table.keys())
-    for key in data_fields:
-        assert key in df_table, f"The data field {key} does not exist in {data_file}."
-        val = df_table[key]
-        d = np.array(val)
-        # For multi-dimension arrays, we split them by rows and
-        # save them as objects in parquet. We need to merge them
-        # together and store them in a tensor.
-        if d.dtype.hasobject and isinstance(d[0], np.ndarray):
-            d = [d[i] for i in range(len(d))]
-            d = np.stack(d)
-        if ("supply_index" in df_columns) and ("feats" in df_columns):
-            data[key] = d.astype(np.float16)
+    Parameters
+    ----------
+    data : dict
+        The data to be saved to the Parquet file.
+    data_file : str
+        The file name of the Parquet file.
+    """
+    arrs = []
+    for key, val in data.items():
+        val = np.asarray(val)
+        assert len(val.shape) in (1, 2), \
+                f"We can only write a vector or a matrix to a Parquet file, but {key} " \
+                + f"has the shape {val.shape}."
+        if len(val.shape) == 1:
+            arrs.append(pa.array(val))
         else:
-            data[key] = d
-    return data
+            arrs.append(pa.FixedSizeListArray.from_arrays(
+                pa.array(np.ascontiguousarray(val).reshape(-1)), val.shape[1]))
+    table = pa.Table.from_arrays(arrs, names=list(data.keys()))
+    pq.write_table(table, data_file)
 
 class HDF5Handle:
     """ HDF5 file handle
@@ -248,7 +287,7 @@ class HDF5Array:
         """ Return Pytorch tensor.
         """
         arr = self._arr[:]
-        return th.tensor(arr)
+        return th.from_numpy(arr)
 
     def to_numpy(self):
         """ Return Numpy array.
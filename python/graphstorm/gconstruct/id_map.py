@@ -17,6 +17,7 @@
     node regression, edge classification and edge regression.
 """
 import numpy as np
+import pandas as pd
 
 from .file_io import HDF5Array
 
@@ -62,6 +63,13 @@ class IdMap:
 
     This creates an ID map for the input IDs.
 
+    Integer IDs are stored in a sorted array together with their new IDs, so that
+    the input IDs can be mapped with a vectorized binary search. If the integer IDs
+    are dense, i.e., they span a range no more than twice the number of IDs,
+    the new IDs are also stored in a lookup table indexed by the IDs directly.
+    Other IDs (e.g., strings) are stored in a Pandas Index, which hashes the IDs
+    without creating a Python dict.
+
     Parameters
     ----------
     ids : Array
@@ -73,11 +81,63 @@ class IdMap:
         # the following operations.
         if isinstance(ids, HDF5Array):
             ids = ids.to_numpy()
-        self._ids = {id1: i for i, id1 in enumerate(ids)}
+        if isinstance(ids, np.ndarray) and np.issubdtype(ids.dtype, np.integer):
+            self._ids = None
+            sort_idx = np.argsort(ids, kind='stable')
+            sorted_ids = ids[sort_idx]
+            # If an ID appears multiple times, it is mapped to its last location.
+            is_last = np.ones(len(sorted_ids), dtype=bool)
+            is_last[:-1] = sorted_ids[1:] != sorted_ids[:-1]
+            self._sorted_ids = sorted_ids[is_last]
+            self._sorted_vals = sort_idx[is_last]
+            self._lookup = None
+            # The lookup table is indexed with int64, so it only supports signed IDs.
+            if len(self._sorted_ids) > 0 and self._sorted_ids.dtype.kind == 'i':
+                self._min_id = int(self._sorted_ids[0])
+                id_range = int(self._sorted_ids[-1]) - self._min_id + 1
+                if id_range <= 2 * len(self._sorted_ids):
+                    self._lookup = np.full((id_range,), -1, dtype=np.int64)
+                    self._lookup[self._sorted_ids - self._min_id] = self._sorted_vals
+        else:
+            ids = pd.Index(ids)
+            # If an ID appears multiple times, it is mapped to its last location.
+            if ids.is_unique:
+                self._vals = None
+            else:
+                is_last = ~ids.duplicated(keep='last')
+                self._vals = np.nonzero(is_last)[0]
+                ids = ids[is_last]
+            self._ids = ids
 
     def __len__(self):
+        if self._ids is None:
+            return len(self._sorted_ids)
         return len(self._ids)
 
+    def _map_int_ids(self, ids):
+        """ Map integer IDs with binary search on the sorted IDs.
+        """
+        assert np.issubdtype(ids.dtype, np.integer), \
+                "The key of ID map is integer, input IDs should also be integers. " \
+                + f"But get {type(ids[0])}."
+        if len(self._sorted_ids) == 0:
+            return np.zeros((0,), dtype=np.int64), np.zeros((0,), dtype=np.int64)
+        if self._lookup is not None:
+            locs = ids.astype(np.int64) - self._min_id
+            in_range = np.logical_and(locs >= 0, locs < len(self._lookup))
+            new_ids = np.full((len(ids),), -1, dtype=np.int64)
+            new_ids[in_range] = self._lookup[locs[in_range]]
+            idx = np.nonzero(new_ids >= 0)[0]
+            return new_ids[idx], idx
+        locs = np.searchsorted(self._sorted_ids, ids)
+        # The IDs larger than all keys are located after the end of the sorted IDs.
+        locs[locs == len(self._sorted_ids)] = 0
+        # If the input ID exists in the ID map, map it to a new ID
+        # and keep its location in the input ID array.
+        # Otherwise, skip the ID.
+        idx = np.nonzero(self._sorted_ids[locs] == ids)[0]
+        return self._sorted_vals[locs[idx]], idx
+
     def map_id(self, ids):
         """ Map the input IDs to the new IDs.
 
@@ -90,6 +150,9 @@ class IdMap:
         -------
         tuple of tensors : the tensor of new IDs, the location of the IDs in the input ID tensor.
         """
+        if self._ids is None:
+            return self._map_int_ids(np.asarray(ids))
+
         for id_ in self._ids:
             # If the data type of the key is string, the input Ids should also be strings.
             if isinstance(id_, str):
@@ -108,13 +171,10 @@ class IdMap:
         # If the input ID exists in the ID map, map it to a new ID
         # and keep its location in the input ID array.
         # Otherwise, skip the ID.
-        new_ids = []
-        idx = []
-        for i, id_ in enumerate(ids):
-            if id_ in self._ids:
-                new_ids.append(self._ids[id_])
-                idx.append(i)
-        return np.array(new_ids), np.array(idx)
+        locs = self._ids.get_indexer(ids)
+        idx = np.nonzero(locs >= 0)[0]
+        new_ids = locs[idx] if self._vals is None else self._vals[locs[idx]]
+        return new_ids.astype(np.int64), idx
 
     def get_key_vals(self):
         """ Get the key value pairs.
@@ -123,7 +183,12 @@ class IdMap:
         -------
         tuple of tensors : The first one has keys and the second has corresponding values.
         """
-        return np.array(list(self._ids.keys())), np.array(list(self._ids.values()))
+        if self._ids is None:
+            # Return the pairs in the order of the new IDs.
+            order = np.argsort(self._sorted_vals)
+            return self._sorted_ids[order], self._sorted_vals[order]
+        vals = np.arange(len(self._ids)) if self._vals is None else self._vals
+        return self._ids.to_numpy(), vals
 
 def map_node_ids(src_ids, dst_ids, edge_type, node_id_map, skip_nonexist_edges):
     """ Map node IDs of source and destination nodes of edges.
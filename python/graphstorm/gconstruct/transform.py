@@ -19,8 +19,10 @@
 
 import os
 import numpy as np
+import pandas as pd
 import torch as th
-from transformers import BertTokenizer
+from transformers import BertTokenizerFast
+from tokenizers import Tokenizer as BackendTokenizer
 from transformers import BertModel, BertConfig
 
 from .file_io import HDF5Array
@@ -69,8 +71,21 @@ class Tokenizer(FeatTransform):
     """
     def __init__(self, col_name, feat_name, bert_model, max_seq_length):
         super(Tokenizer, self).__init__(col_name, feat_name)
-        self.tokenizer = BertTokenizer.from_pretrained(bert_model)
+        # The fast tokenizer is implemented in Rust and tokenizes a batch of
+        # strings much faster than the Python implementation.
+        self.tokenizer = BertTokenizerFast.from_pretrained(bert_model)
         self.max_seq_length = max_seq_length
+        # The tokenization results always have the same shape, so we configure
+        # the truncation and the padding of the Rust tokenizer once and call it
+        # directly. This skips the Python wrapper of the tokenizer in every call.
+        # We use a copy so that the tokenizer of the wrapper is not changed.
+        self._backend_tokenizer = BackendTokenizer.from_str(
+            self.tokenizer.backend_tokenizer.to_str())
+        self._backend_tokenizer.enable_truncation(max_length=max_seq_length)
+        self._backend_tokenizer.enable_padding(length=max_seq_length,
+                                               pad_id=self.tokenizer.pad_token_id,
+                                               pad_type_id=self.tokenizer.pad_token_type_id,
+                                               pad_token=self.tokenizer.pad_token)
 
     def __call__(self, strs):
         """ Tokenization function.
@@ -84,24 +99,30 @@ class Tokenizer(FeatTransform):
         -------
         a dict of tokenization results.
         """
-        tokens = []
-        att_masks = []
-        type_ids = []
+        strs = list(strs)
         for s in strs:
             assert isinstance(s, str), "The input of the tokenizer has to be a string."
-            t = self.tokenizer(s, max_length=self.max_seq_length,
-                               truncation=True, padding='max_length', return_tensors='pt')
-            tokens.append(t['input_ids'])
-            # The masks are small integers. We can use int4 or int8 to store them.
-            # This can signficantly reduce memory consumption.
-            att_masks.append(t['attention_mask'].to(th.int8))
-            type_ids.append(t['token_type_ids'].to(th.int8))
+        # The text data often contain duplicated strings. We only tokenize
+        # the unique strings and copy the results to the duplicated ones.
+        # The strings are hashed as Python objects. A Numpy string array would
+        # pad every string to the length of the longest one.
+        inverse, uniq_strs = pd.factorize(np.array(strs, dtype=object))
+        # Tokenize all strings in one call. All results are padded to max_seq_length.
+        encodings = self._backend_tokenizer.encode_batch(uniq_strs.tolist())
         token_id_name = 'input_ids'
         atten_mask_name = 'attention_mask'
         token_type_id_name = 'token_type_ids'
-        return {token_id_name: th.cat(tokens, dim=0).numpy(),
-                atten_mask_name: th.cat(att_masks, dim=0).numpy(),
-                token_type_id_name: th.cat(type_ids, dim=0).numpy()}
+        # The vocabulary of BERT fits in int32 and the masks are small integers,
+        # so we use int32 and int8 to store them.
+        # This can signficantly reduce memory consumption.
+        res = {token_id_name: np.array([e.ids for e in encodings], dtype=np.int32),
+               atten_mask_name: np.array([e.attention_mask for e in encodings],
+                                         dtype=np.int8),
+               token_type_id_name: np.array([e.type_ids for e in encodings],
+                                            dtype=np.int8)}
+        if len(uniq_strs) < len(strs):
+            res = {key: val[inverse] for key, val in res.items()}
+        return res
 
 class Text2BERT(FeatTransform):
     """ Compute BERT embeddings.
@@ -168,34 +189,44 @@ class Text2BERT(FeatTransform):
         dict: BERT embeddings.
         """
         self._init()
-        outputs = self.tokenizer(strs)
-        if self.infer_batch_size is not None:
-            tokens_list = th.split(th.tensor(outputs['input_ids']), self.infer_batch_size)
-            att_masks_list = th.split(th.tensor(outputs['attention_mask']),
-                                      self.infer_batch_size)
-            token_types_list = th.split(th.tensor(outputs['token_type_ids']),
-                                        self.infer_batch_size)
-        else:
-            tokens_list = [th.tensor(outputs['input_ids'])]
-            att_masks_list = [th.tensor(outputs['attention_mask'])]
-            token_types_list = [th.tensor(outputs['token_type_ids'])]
+        # We only compute the BERT embeddings of the unique strings.
+        inverse, uniq_strs = pd.factorize(np.array(list(strs), dtype=object))
+        outputs = self.tokenizer(uniq_strs.tolist())
+        tokens = th.tensor(outputs['input_ids'])
+        att_masks = th.tensor(outputs['attention_mask'])
+        token_types = th.tensor(outputs['token_type_ids'])
+        # The tokens are padded to the maximal sequence length. We sort the strings
+        # by their lengths and cut the padding that all strings in a batch share,
+        # so that the BERT model does not compute on the padding tokens.
+        # The attention masks exclude the padding tokens, so this doesn't change
+        # the BERT embeddings.
+        lens = att_masks.sum(dim=1)
+        order = th.argsort(lens, descending=True)
+        batch_size = self.infer_batch_size if self.infer_batch_size is not None \
+                else len(order)
         with th.no_grad():
             out_embs = []
-            for tokens, att_masks, token_types in zip(tokens_list, att_masks_list,
-                                                      token_types_list):
+            for batch_order in th.split(order, batch_size):
+                max_len = int(lens[batch_order[0]])
+                batch_tokens = tokens[batch_order, :max_len].long()
+                batch_att_masks = att_masks[batch_order, :max_len].long()
+                batch_token_types = token_types[batch_order, :max_len].long()
                 if self.device is not None:
-                    outputs = self.lm_model(tokens.to(self.device),
-                                            attention_mask=att_masks.to(self.device).long(),
-                                            token_type_ids=token_types.to(self.device).long())
+                    outputs = self.lm_model(batch_tokens.to(self.device),
+                                            attention_mask=batch_att_masks.to(self.device),
+                                            token_type_ids=batch_token_types.to(self.device))
                 else:
-                    outputs = self.lm_model(tokens,
-                                            attention_mask=att_masks.long(),
-                                            token_type_ids=token_types.long())
+                    outputs = self.lm_model(batch_tokens,
+                                            attention_mask=batch_att_masks,
+                                            token_type_ids=batch_token_types)
                 out_embs.append(outputs.pooler_output.cpu().numpy())
-        if len(out_embs) > 1:
-            return {self.feat_name: np.concatenate(out_embs)}
-        else:
-            return {self.feat_name: out_embs[0]}
+        out_embs = np.concatenate(out_embs) if len(out_embs) > 1 else out_embs[0]
+        # Put the BERT embeddings back to the order of the input strings.
+        embs = np.empty_like(out_embs)
+        embs[order.numpy()] = out_embs
+        if len(uniq_strs) < len(inverse):
+            embs = embs[inverse]
+        return {self.feat_name: embs}
 
 class Noop(FeatTransform):
     """ This doesn't transform the feature.
@@ -544,6 +575,29 @@ def process_labels(data, label_processors):
     assert len(label_processors) == 1, "We only support one label per node/edge type."
     return label_processors[0](data)
 
+def do_multithread_read(conf, feat_ops):
+    """ Test whether the input data can be read with threads.
+
+    PyArrow decodes Parquet files without holding the GIL. If the features don't
+    require transformations in Python (e.g., tokenization or BERT inference),
+    the data files can be read by threads in the main process, so that the data
+    don't need to be sent from worker processes.
+
+    Parameters
+    ----------
+    conf : dict
+        The configuration of the input data.
+    feat_ops : dict of FeatTransform
+        The operations run on the input features.
+
+    Returns
+    -------
+    bool : whether we can read the data with threads.
+    """
+    if conf['format']['name'] != "parquet":
+        return False
+    return feat_ops is None or all(isinstance(op, Noop) for op in feat_ops)
+
 def do_multiprocess_transform(conf, feat_ops, label_ops, in_files):
     """ Test whether the input data requires multiprocessing.
 
@@ -21,6 +21,8 @@ import multiprocessing
 from multiprocessing import Process
 import queue
 import gc
+from concurrent.futures import ThreadPoolExecutor
+import pickle
 
 import numpy as np
 import dgl
@@ -62,7 +64,28 @@ def worker_fn(worker_id, task_queue, res_queue, user_parser):
     except queue.Empty:
         pass
 
-def multiprocessing_data_read(in_files, num_processes, user_parser):
+def _order_by_file_size(in_files):
+    """ Order the input files from the largest to the smallest.
+
+    The workers take files from a shared task queue, so a worker takes the next file
+    as soon as it finishes one. If the large files are processed first, the small
+    files at the end balance the load and no worker ends up processing a large file
+    alone while the others are idle.
+
+    Parameters
+    ----------
+    in_files : list of str
+        The input data files.
+
+    Returns
+    -------
+    list of int : the indices of the input files.
+    """
+    sizes = [os.path.getsize(in_file) if os.path.isfile(in_file) else 0
+             for in_file in in_files]
+    return sorted(range(len(in_files)), key=lambda i: sizes[i], reverse=True)
+
+def multiprocessing_data_read(in_files, num_processes, user_parser, use_threads=False):
     """ Read data from multiple files with multiprocessing.
 
     It creates a set of worker processes, each of which runs a worker function.
@@ -74,6 +97,10 @@ def multiprocessing_data_read(in_files, num_processes, user_parser):
 
     If there are only one input file, it reads the data from the input file in the main process.
 
+    If `use_threads` is True, the files are processed by a pool of threads in the main
+    process instead, so that the processed data don't need to be sent between processes.
+    This only helps if the user parser releases the GIL most of the time.
+
     Parameters
     ----------
     in_files : list of str
@@ -82,30 +109,44 @@ def multiprocessing_data_read(in_files, num_processes, user_parser):
         The number of processes that run in parallel.
     user_parser : callable
         The user-defined function to read and process the data files.
+    use_threads : bool
+        Whether to process the files with threads instead of processes.
 
     Returns
     -------
     a dict : key is the file index, the value is processed data.
     """
-    if num_processes > 0 and len(in_files) > 1:
+    if num_processes > 0 and len(in_files) > 1 and use_threads:
+        with ThreadPoolExecutor(max_workers=min(num_processes, len(in_files))) as executor:
+            futures = {i: executor.submit(user_parser, in_files[i])
+                       for i in _order_by_file_size(in_files)}
+            return {i: futures[i].result() for i in range(len(in_files))}
+    elif num_processes > 0 and len(in_files) > 1:
         processes = []
         manager = multiprocessing.Manager()
         task_queue = manager.Queue()
-        res_queue = manager.Queue(8)
+        # The processed data are sent to the master process through a pipe directly.
+        # A managed queue would relay the data through the manager process,
+        # which pickles and copies the data twice.
+        res_queue = multiprocessing.Queue(8)
         num_files = len(in_files)
-        for i, in_file in enumerate(in_files):
-            task_queue.put((i, in_file))
-        for i in range(num_processes):
+        for i in _order_by_file_size(in_files):
+            task_queue.put((i, in_files[i]))
+        # Each worker takes at least one file, so there is no need to start
+        # more workers than files.
+        for i in range(min(num_processes, num_files)):
             proc = Process(target=worker_fn, args=(i, task_queue, res_queue, user_parser))
             proc.start()
             processes.append(proc)
 
+        # The results are collected in a local dict. We don't run a full garbage
+        # collection for every file, because its cost grows with the data that
+        # have been collected so far.
         return_dict = {}
         while len(return_dict) < num_files:
             file_idx, vals= res_queue.get()
             return_dict[file_idx] = vals
             sys_tracker.check(f'process data file: {file_idx}')
-            gc.collect()
 
         for proc in processes:
             proc.join()
@@ -140,11 +181,14 @@ def _merge_arrs(arrs, tensor_path):
     """ Merge the arrays.
 
     The merged array may be stored in a file specified by the path.
+    Each input array is copied to the merged array directly and is released
+    from the input list once it is copied, so the peak memory is only
+    the merged array plus one input array instead of all the input arrays.
 
     Parameters
     ----------
     arrs : list of arrays.
-        The input arrays.
+        The input arrays. The list is emptied after merging.
     tensor_path : str
         The path where the Numpy array is stored.
 
@@ -154,19 +198,16 @@ def _merge_arrs(arrs, tensor_path):
     """
     assert isinstance(arrs, list)
     shape = _get_tot_shape(arrs)
-    dtype = arrs[0].dtype
     if tensor_path is not None:
-        out_arr = np.memmap(tensor_path, dtype, mode="w+", shape=shape)
-        row_idx = 0
-        for arr in arrs:
-            out_arr[row_idx:(row_idx + arr.shape[0])] = arr[:]
-            row_idx += arr.shape[0]
-        return out_arr
-    elif isinstance(arrs[0], HDF5Array):
-        arrs = [arr.to_numpy() for arr in arrs]
-        return np.concatenate(arrs)
+        out_arr = np.memmap(tensor_path, arrs[0].dtype, mode="w+", shape=shape)
     else:
-        return np.concatenate(arrs)
+        out_arr = np.empty(shape, dtype=np.result_type(*[arr.dtype for arr in arrs]))
+    row_idx = 0
+    for i, arr in enumerate(arrs):
+        out_arr[row_idx:(row_idx + arr.shape[0])] = arr[:]
+        row_idx += arr.shape[0]
+        arrs[i] = None
+    return out_arr
 
 class ExtMemArrayMerger:
     """ Merge multiple Numpy arrays.
@@ -241,8 +282,10 @@ def _save_maps(output_dir, fname, map_data):
     """
     map_file = f"{fname}.pt"
     map_file = os.path.join(output_dir, map_file)
-    # Use torch save as tensors are torch tensors
-    th.save(map_data, map_file)
+    # Use torch save as tensors are torch tensors. Write through a large
+    # buffer so that the serialized stream is flushed in big chunks.
+    with open(map_file, 'wb', buffering=1<<20) as f:
+        th.save(map_data, f, pickle_protocol=pickle.HIGHEST_PROTOCOL)
 
 def partition_graph(g, node_data, edge_data, graph_name, num_partitions, output_dir,
                     part_method=None, save_mapping=True):
@@ -303,7 +346,7 @@ def partition_graph(g, node_data, edge_data, graph_name, num_partitions, output_
             # we use them to retrieve the right node features.
             orig_ids = data[ntype + "/" + orig_id_name]
             for name, ndata in node_data[ntype].items():
-                data[ntype + "/" + name] = th.tensor(ndata[orig_ids])
+                data[ntype + "/" + name] = th.from_numpy(ndata[orig_ids])
             sys_tracker.check(f'Get node data of node {ntype} in partition {i}')
         # Delete the original node IDs from the node data.
         for ntype in g.ntypes:
@@ -318,7 +361,7 @@ def partition_graph(g, node_data, edge_data, graph_name, num_partitions, output_
             # we use them to retrieve the right edge features.
             orig_ids = data[_etype_tuple_to_str(etype) + '/' + orig_id_name]
             for name, edata in edge_data[etype].items():
-                data[_etype_tuple_to_str(etype) + "/" + name] = th.tensor(edata[orig_ids])
+                data[_etype_tuple_to_str(etype) + "/" + name] = th.from_numpy(edata[orig_ids])
             sys_tracker.check(f'Get edge data of edge {etype} in partition {i}')
         for etype in g.canonical_etypes:
             del data[_etype_tuple_to_str(etype) + '/' + orig_id_name]
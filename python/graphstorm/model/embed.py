@@ -217,6 +217,10 @@ class GSNodeEncoderInputLayer(GSNodeInputLayer):
         """
         assert isinstance(input_feats, dict), 'The input features should be in a dict.'
         assert isinstance(input_nodes, dict), 'The input node IDs should be in a dict.'
+        # The node IDs are used to look up the sparse embeddings. Convert them
+        # to tensors once in case they are passed as NumPy arrays.
+        input_nodes = {ntype: th.as_tensor(nids, dtype=th.int64) \
+                for ntype, nids in input_nodes.items()}
         embs = {}
         for ntype in input_nodes:
             if ntype in input_feats:
@@ -367,6 +371,10 @@ class GSNodeEncoderCustomInputLayer(GSNodeInputLayer):
         """
         assert isinstance(input_feats, dict), 'The input features should be in a dict.'
         assert isinstance(input_nodes, dict), 'The input node IDs should be in a dict.'
+        # The node IDs are used to look up the sparse embeddings. Convert them
+        # to tensors once in case they are passed as NumPy arrays.
+        input_nodes = {ntype: th.as_tensor(nids, dtype=th.int64) \
+                for ntype, nids in input_nodes.items()}
         embs = {}
         for ntype in input_nodes:
             if ntype in input_feats:
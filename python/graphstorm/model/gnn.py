@@ -79,11 +79,20 @@ class GSOptimizer():
         for optimizer in all_opts:
             assert optimizer is not None
 
-    def zero_grad(self):
+    def zero_grad(self, set_to_none=False):
         """ Setting the gradient to zero
-        """
-        all_opts = self.dense_opts + self.lm_opts + self.sparse_opts
-        for optimizer in all_opts:
+
+        Parameters
+        ----------
+        set_to_none : bool
+            Whether to set the gradients of the dense and language model
+            parameters to None instead of filling them with zeros. The sparse
+            optimizers always reset their gradients.
+        """
+        for optimizer in self.dense_opts + self.lm_opts:
+            optimizer.zero_grad(set_to_none=set_to_none)
+        for optimizer in self.sparse_opts:
+            # DGL sparse optimizers do not accept set_to_none.
             optimizer.zero_grad()
 
     def step(self):
@@ -93,6 +102,27 @@ class GSOptimizer():
         for optimizer in all_opts:
             optimizer.step()
 
+    def scale_grads(self, scale):
+        """ Scale the gradients accumulated since the last zero_grad.
+
+        Parameters
+        ----------
+        scale : float
+            The factor to multiply the gradients by.
+        """
+        for optimizer in self.dense_opts + self.lm_opts:
+            for group in optimizer.param_groups:
+                for param in group['params']:
+                    if param.grad is not None:
+                        param.grad.mul_(scale)
+        for optimizer in self.sparse_opts:
+            # DGL sparse optimizers read the gradients of the embeddings
+            # traced in the forward computation.
+            for emb in optimizer._params: # pylint: disable=protected-access
+                for _, trace_emb in emb._trace: # pylint: disable=protected-access
+                    if trace_emb.grad is not None:
+                        trace_emb.grad.mul_(scale)
+
     def load_opt_state(self, path, device=None):
         """ Load the optimizer states
         """
@@ -72,6 +72,54 @@ class GraphConvEncoder(GSLayer):     # pylint: disable=abstract-method
         """
         return self._layers
 
+def _copy_to_cpu_async(tensor, copy_stream):
+    """ Launch a non-blocking copy of a GPU tensor into pinned CPU memory.
+
+    Parameters
+    ----------
+    tensor : Tensor
+        The tensor to copy.
+    copy_stream : torch.cuda.Stream
+        The CUDA stream used for the copy. If None, the copy is synchronous.
+
+    Returns
+    -------
+    Tensor : the CPU tensor.
+    torch.cuda.Event : the event recorded after the copy, or None.
+    """
+    if not tensor.is_cuda:
+        # The tensor is already on CPU, there is nothing to copy.
+        return tensor, None
+    if copy_stream is None:
+        return tensor.cpu(), None
+    # The copy should start after the computation of the tensor is done.
+    copy_stream.wait_stream(th.cuda.current_stream())
+    with th.cuda.stream(copy_stream):
+        cpu_tensor = th.empty(tensor.shape, dtype=tensor.dtype, pin_memory=True)
+        cpu_tensor.copy_(tensor, non_blocking=True)
+        # Keep the GPU memory of the tensor alive until the copy finishes.
+        tensor.record_stream(copy_stream)
+        event = th.cuda.Event()
+        event.record(copy_stream)
+    return cpu_tensor, event
+
+def _write_dist_tensors(pending_writes):
+    """ Write the tensors into the DistTensors once their copies to CPU complete.
+
+    The writes run in the main thread, because the RPC client of DistTensor
+    is not thread-safe and is also used by the data loader to pull data.
+
+    Parameters
+    ----------
+    pending_writes : list of tuples
+        Each tuple contains a DistTensor, the indices to write, the CPU tensor
+        and the event recorded after the copy to CPU.
+    """
+    for dist_tensor, idx, cpu_tensor, event in pending_writes:
+        if event is not None:
+            event.synchronize()
+        dist_tensor[idx] = cpu_tensor
+
 def dist_inference(g, gnn_encoder, node_feats, batch_size, fanout,
                    edge_mask=None, task_tracker=None):
     """Distributed inference of final representation over all node types.
@@ -99,25 +147,35 @@ def dist_inference(g, gnn_encoder, node_feats, batch_size, fanout,
     """
     device = gnn_encoder.device
     x = node_feats
+    # The embeddings are copied to CPU on a separate CUDA stream and written
+    # to the DistTensors when the next mini-batch arrives, so that the sampling
+    # of the next mini-batch overlaps with the data transfer.
+    copy_stream = th.cuda.Stream(device=device) \
+            if th.device(device).type == 'cuda' else None
+    # The nodes to infer do not change across layers.
+    infer_nodes = {}
+    for ntype in g.ntypes:
+        infer_nodes[ntype] = node_split(th.ones((g.number_of_nodes(ntype),),
+                                                dtype=th.bool),
+                                        partition_book=g.get_partition_book(),
+                                        ntype=ntype, force_even=False)
+    # Layer i reads the output of layer i-1 and writes its own output, so
+    # two DistTensors per shape are enough. They are used in turns.
+    y_buffers = {}
     with th.no_grad():
         for i, layer in enumerate(gnn_encoder.layers):
-            # get the fanout for this layer
-            y = {}
-            for k in g.ntypes:
-                h_dim = gnn_encoder.h_dims \
-                        if i < len(gnn_encoder.layers) - 1 else gnn_encoder.out_dims
-                y[k] = DistTensor((g.number_of_nodes(k), h_dim),
-                                  dtype=th.float32, name='h-' + str(i),
+            h_dim = gnn_encoder.h_dims \
+                    if i < len(gnn_encoder.layers) - 1 else gnn_encoder.out_dims
+            buf_key = (i % 2, h_dim)
+            if buf_key not in y_buffers:
+                y_buffers[buf_key] = {
+                    k: DistTensor((g.number_of_nodes(k), h_dim),
+                                  dtype=th.float32, name=f'h-{i % 2}-{h_dim}',
                                   part_policy=g.get_node_partition_policy(k),
                                   # TODO(zhengda) this makes the tensor persistent in memory.
-                                  persistent=True)
-
-            infer_nodes = {}
-            for ntype in g.ntypes:
-                infer_nodes[ntype] = node_split(th.ones((g.number_of_nodes(ntype),),
-                                                        dtype=th.bool),
-                                                partition_book=g.get_partition_book(),
-                                                ntype=ntype, force_even=False)
+                                  persistent=True) for k in g.ntypes}
+            y = y_buffers[buf_key]
+
             # need to provide the fanout as a list, the number of layers is one obviously here
             sampler = dgl.dataloading.MultiLayerNeighborSampler([fanout], mask=edge_mask)
             dataloader = dgl.dataloading.DistNodeDataLoader(g, infer_nodes, sampler,
@@ -125,6 +183,7 @@ def dist_inference(g, gnn_encoder, node_feats, batch_size, fanout,
                                                             shuffle=True,
                                                             drop_last=False)
 
+            pending_writes = []
             for iter_l, (input_nodes, output_nodes, blocks) in enumerate(tqdm.tqdm(dataloader)):
                 if task_tracker is not None:
                     task_tracker.keep_alive(report_step=iter_l)
@@ -140,6 +199,10 @@ def dist_inference(g, gnn_encoder, node_feats, batch_size, fanout,
                     assert len(g.ntypes) == 1
                     output_nodes = {g.ntypes[0]: output_nodes}
 
+                # Write the outputs of the previous mini-batch before pulling
+                # the input features of this mini-batch.
+                _write_dist_tensors(pending_writes)
+                pending_writes = []
                 h = {k: x[k][input_nodes[k]].to(device) for k in input_nodes.keys()}
                 h = layer(block, h)
 
@@ -147,8 +210,12 @@ def dist_inference(g, gnn_encoder, node_feats, batch_size, fanout,
                     # some ntypes might be in the tensor h but are not in the output nodes
                     # that have empty tensors
                     if k in output_nodes:
-                        y[k][output_nodes[k]] = h[k].cpu()
+                        h_cpu, event = _copy_to_cpu_async(h[k], copy_stream)
+                        pending_writes.append((y[k], output_nodes[k], h_cpu, event))
 
+            # All the embeddings of this layer should be written before
+            # they are read by the next layer.
+            _write_dist_tensors(pending_writes)
             x = y
             th.distributed.barrier()
     return y
@@ -166,7 +166,8 @@ class HFBertWrapper(GSFLanguageModelWrapper):
         input_id_lens = []
 
         for ntype in input_ntypes:
-            input_id = input_lm_feats[ntype][TOKEN_IDX].to(dev)
+            # The token IDs may be stored in a smaller integer type.
+            input_id = input_lm_feats[ntype][TOKEN_IDX].to(dev).long()
             input_id_lens.append(input_id.shape[0])
             # If ATT_MASK_IDX does not exist, we expect the VALID_LEN
             # stores the valid token length
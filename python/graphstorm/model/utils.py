@@ -259,6 +259,27 @@ def _get_data_range(rank, world_size, num_embs):
     end = num_embs if rank + 1 == world_size else end
     return start, end
 
+def _load_id_mapping(node_id_mapping_file):
+    """ Load the node ID mapping saved by the graph partition.
+
+        The ID mapping of a large graph can take tens of GBytes. With torch 2.1+,
+        we memory-map the file so that the tensor storage is paged in lazily by
+        the OS instead of being copied into the process memory up front.
+
+        Parameters
+        ----------
+        node_id_mapping_file: str
+            Path to the file storing node id mapping generated by the
+            graph partition algorithm.
+
+        Returns
+        -------
+        Tensor or dict of Tensors: the node ID mapping.
+    """
+    if th.__version__ < "2.1.0":
+        return th.load(node_id_mapping_file)
+    return th.load(node_id_mapping_file, mmap=True)
+
 def _exchange_node_id_mapping(local_rank, world_size, device,
     node_id_mapping, num_embs):
     """ Rank0 loads node_id_mappings and spreads it to other ranks.
@@ -351,7 +372,7 @@ def save_embeddings(model_path, embeddings, local_rank, world_size,
     if node_id_mapping_file is not None:
         if isinstance(embeddings, (dgl.distributed.DistTensor, LazyDistTensor)):
             # only host 0 will load node id mapping from disk
-            node_id_mapping = th.load(node_id_mapping_file) \
+            node_id_mapping = _load_id_mapping(node_id_mapping_file) \
                 if local_rank == 0 else None
 
             nid_mapping = _exchange_node_id_mapping(
@@ -359,7 +380,7 @@ def save_embeddings(model_path, embeddings, local_rank, world_size,
         elif isinstance(embeddings, dict):
             nid_mapping = {}
             # only host 0 will load node id mapping from disk
-            node_id_mappings = th.load(node_id_mapping_file) \
+            node_id_mappings = _load_id_mapping(node_id_mapping_file) \
                 if local_rank == 0 else None
 
             for name, emb in embeddings.items():
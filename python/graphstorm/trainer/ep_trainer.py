@@ -16,18 +16,24 @@
     GraphStorm trainer for edge prediction
 """
 import time
+from contextlib import nullcontext
 
 import dgl
 import torch as th
-from torch.nn.parallel import DistributedDataParallel
 
 from ..model.edge_gnn import edge_mini_batch_gnn_predict, edge_mini_batch_predict
 from ..model.edge_gnn import GSgnnEdgeModelInterface
 from ..model.gnn import do_full_graph_inference, GSgnnModelBase, GSgnnModel
-from .gsgnn_trainer import GSgnnTrainer
+from .gsgnn_trainer import GSgnnTrainer, StepTimer
 
 from ..utils import sys_tracker
 
+def _compile_errors():
+    """ The errors that TorchDynamo raises when it cannot compile a model.
+    """
+    from torch._dynamo import exc # pylint: disable=import-outside-toplevel
+    return (exc.BackendCompilerFailed, exc.Unsupported)
+
 class GSgnnEdgePredictionTrainer(GSgnnTrainer):
     """ Edge prediction trainer.
 
@@ -52,7 +58,9 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
             save_model_path=None,
             save_model_frequency=None,
             save_perf_results_path=None,
-            freeze_input_layer_epochs=0):
+            freeze_input_layer_epochs=0,
+            grad_accum_steps=1,
+            use_compile=False):
         """ The fit function for edge prediction.
 
         Parameters
@@ -78,6 +86,16 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
             Freeze input layer model for N epochs. This is commonly used when
             the input layer contains language models.
             Default: 0, no freeze.
+        grad_accum_steps: int
+            The number of iterations to accumulate the gradients before updating
+            the model. Gradients are only synchronized across trainers in the
+            iteration that updates the model.
+            Default: 1, update the model in every iteration.
+        use_compile: bool
+            Whether to compile the model with torch.compile for training. It requires
+            PyTorch 2.0 or later. If the model cannot be compiled, training falls back
+            to eager mode.
+            Default: False.
         """
         # Check the correctness of configurations.
         if self.evaluator is not None:
@@ -86,14 +104,17 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
         if not use_mini_batch_infer:
             assert isinstance(self._model, GSgnnModel), \
                     "Only GSgnnModel supports full-graph inference."
+        assert grad_accum_steps >= 1, "grad_accum_steps should be at least 1."
 
         # with freeze_input_layer_epochs is 0, computation graph will not be changed.
-        static_graph = freeze_input_layer_epochs == 0
-        model = DistributedDataParallel(self._model, device_ids=[self.dev_id],
-                                        output_device=self.dev_id,
-                                        find_unused_parameters=True,
-                                        static_graph=static_graph)
+        # DDP does not support no_sync() with a static graph, which is used
+        # to accumulate gradients.
+        static_graph = freeze_input_layer_epochs == 0 and grad_accum_steps == 1
+        model = self.get_ddp_model(static_graph)
         device = model.device
+        train_model = self._compile_model(model) if use_compile else model
+        # Only the failures of compiling the model fall back to eager mode.
+        compile_errors = _compile_errors() if train_model is not model else ()
         data = train_loader.data
 
         # Preparing input layer for training or inference.
@@ -107,10 +128,16 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
         dur = []
         best_epoch = 0
         num_input_nodes = 0
-        forward_time = 0
-        back_time = 0
+        # Only rank 0 reports the compute time.
+        step_timer = StepTimer(device) if self.rank == 0 else None
         total_steps = 0
+        # The iteration and the validation score of the latest evaluation.
+        last_eval_step, last_val_score = -1, None
         early_stop = False # used when early stop is True
+        # The training loss is accumulated on device and only read back to CPU
+        # when it is reported, to avoid a device to host sync in every iteration.
+        loss_accum = th.zeros((), device=device)
+        loss_count = 0
         sys_tracker.check('start training')
         for epoch in range(num_epochs):
             model.train()
@@ -118,51 +145,85 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
             if freeze_input_layer_epochs <= epoch:
                 self._model.unfreeze_input_encoder()
             # TODO(xiangsx) Support unfreezing gnn encoder and decoder
-            for i, (input_nodes, batch_graph, blocks) in enumerate(train_loader):
+            batch_iter = self._prefetch_batches(train_loader, data, device)
+            # The number of iterations in the current accumulation window.
+            num_accum = 0
+            for i, (batch_tic, prepared, is_last) in enumerate(batch_iter):
+                # The iteration time is measured from the arrival of the mini-batch
+                # from the data loader, the same as in the other trainers.
+                input_nodes, input_feats, lbl, blocks, batch_graph = prepared
                 total_steps += 1
-                batch_tic = time.time()
 
-                if not isinstance(input_nodes, dict):
-                    assert len(batch_graph.ntypes) == 1
-                    input_nodes = {batch_graph.ntypes[0]: input_nodes}
-                input_feats = data.get_node_feats(input_nodes, device)
-                # retrieving seed edge id from the graph to find labels
-                # TODO(zhengda) expand code for multiple edge types
-                assert len(batch_graph.etypes) == 1
-                target_etype = batch_graph.canonical_etypes[0]
-                # TODO(zhengda) the data loader should return labels directly.
-                seeds = batch_graph.edges[target_etype[1]].data[dgl.EID]
-                lbl = data.get_labels({target_etype: seeds}, device)
-                blocks = [block.to(device) for block in blocks]
-                batch_graph = batch_graph.to(device)
                 for _, nodes in input_nodes.items():
                     num_input_nodes += nodes.shape[0]
 
-                t2 = time.time()
-                # TODO(zhengda) we don't support edge features for now.
-                loss = model(blocks, batch_graph, input_feats, None, lbl, input_nodes)
-
-                t3 = time.time()
-                self.optimizer.zero_grad()
-                loss.backward()
-                self.optimizer.step()
-                forward_time += (t3 - t2)
-                back_time += (time.time() - t3)
-
-                self.log_metric("Train loss", loss.item(), total_steps)
-
-                if i % 20 == 0 and self.rank == 0:
-                    # Print task specific info.
-                    print(
-                        "Part {} | Epoch {:05d} | Batch {:03d} | Train Loss: {:.4f} | Time: {:.4f}".
-                        format(self.rank, epoch, i, loss.item(), time.time() - batch_tic))
-                    num_input_nodes = forward_time = back_time = 0
+                if num_accum == 0:
+                    self.optimizer.zero_grad(set_to_none=True)
+                num_accum += 1
+                do_eval = self.evaluator is not None and \
+                    self.evaluator.do_eval(total_steps, epoch_end=False)
+                # Skip the gradient all-reduce until the last iteration
+                # of an accumulation window. The window is closed early at the end
+                # of an epoch and before an evaluation, which may stop training,
+                # so that no gradients are left behind.
+                update_model = num_accum == grad_accum_steps or is_last or do_eval
+                # The model is not wrapped by DDP if there is only one trainer.
+                sync_ctx = nullcontext() if update_model or not hasattr(model, "no_sync") \
+                    else model.no_sync()
+
+                if step_timer is not None:
+                    step_timer.mark()
+                with sync_ctx:
+                    # TODO(zhengda) we don't support edge features for now.
+                    try:
+                        loss = train_model(blocks, batch_graph, input_feats, None, lbl,
+                                           input_nodes)
+                    except compile_errors as err:
+                        # Dynamo cannot compile the model. Fall back to the eager model.
+                        if self.rank == 0:
+                            print(f"Warning: fail to compile the model ({err}). " \
+                                  "Fall back to eager mode.")
+                        train_model = model
+                        compile_errors = ()
+                        loss = model(blocks, batch_graph, input_feats, None, lbl, input_nodes)
+
+                    if step_timer is not None:
+                        step_timer.mark()
+                    (loss / grad_accum_steps).backward()
+                if update_model:
+                    if num_accum < grad_accum_steps:
+                        # The losses are divided by grad_accum_steps, but this
+                        # window has fewer iterations.
+                        self.optimizer.scale_grads(grad_accum_steps / num_accum)
+                    self.optimizer.step()
+                    num_accum = 0
+                if step_timer is not None:
+                    step_timer.mark()
+
+                loss_accum += loss.detach()
+                loss_count += 1
+
+                if i % 20 == 0:
+                    # The average training loss since the last report.
+                    train_loss = (loss_accum / loss_count).item()
+                    loss_accum.zero_()
+                    loss_count = 0
+                    self.log_metric("Train loss", train_loss, total_steps)
+                    if self.rank == 0:
+                        forward_time, back_time = step_timer.elapsed()
+                        # Print task specific info.
+                        print(
+                            "Part {} | Epoch {:05d} | Batch {:03d} | Train Loss: {:.4f} | " \
+                            "Time: {:.4f} | Forward: {:.4f} | Backward: {:.4f}".format(
+                                self.rank, epoch, i, train_loss, time.time() - batch_tic,
+                                forward_time, back_time))
+                        num_input_nodes = 0
 
                 val_score = None
-                if self.evaluator is not None and \
-                    self.evaluator.do_eval(total_steps, epoch_end=False):
-                    val_score = self.eval(model.module, val_loader, test_loader,
+                if do_eval:
+                    val_score = self.eval(self._model, val_loader, test_loader,
                                         use_mini_batch_infer, total_steps)
+                    last_eval_step, last_val_score = total_steps, val_score
 
                     if self.evaluator.do_early_stop(val_score):
                         early_stop = True
@@ -195,11 +256,16 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
 
             val_score = None
             if self.evaluator is not None and self.evaluator.do_eval(total_steps, epoch_end=True):
-                val_score = self.eval(model.module, val_loader, test_loader, use_mini_batch_infer,
-                                    total_steps)
+                if last_eval_step == total_steps:
+                    # The last iteration of the epoch has evaluated the model
+                    # and the model has not changed since then.
+                    val_score = last_val_score
+                else:
+                    val_score = self.eval(self._model, val_loader, test_loader,
+                                          use_mini_batch_infer, total_steps)
 
-                if self.evaluator.do_early_stop(val_score):
-                    early_stop = True
+                    if self.evaluator.do_early_stop(val_score):
+                        early_stop = True
 
             # After each epoch, check to save the top k models. If has validation score, will save
             # the best top k. But if no validation, will either save the last k model or all models
@@ -207,17 +273,23 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
             # to be None, so that we can have a determistic model folder name for testing and debug.
             self.save_topk_models(model, epoch, None, val_score, save_model_path)
 
-            th.distributed.barrier()
+            # Wait for the model saving to finish. All the ranks also leave
+            # the training loop together if training stops early.
+            if save_model_path is not None or early_stop:
+                th.distributed.barrier()
 
             # early_stop, exit training
             if early_stop is True:
                 break
 
-        print("Peak Mem alloc: {:.4f} MB".format(th.cuda.max_memory_allocated(device) / 1024 /1024))
+        # The peak GPU memory is only reported for diagnosis.
+        peak_mem = th.cuda.max_memory_allocated(device) / 1024 / 1024 \
+            if th.device(device).type == 'cuda' else 0
+        print("Peak Mem alloc: {:.4f} MB".format(peak_mem))
         if self.rank == 0 and self.evaluator is not None:
             output = {'best_test_score': self.evaluator.best_test_score,
                        'best_val_score': self.evaluator.best_val_score,
-                       'peak_mem_alloc_MB': th.cuda.max_memory_allocated(device) / 1024 / 1024,
+                       'peak_mem_alloc_MB': peak_mem,
                        'best_epoch': best_epoch}
             self.log_params(output)
 
@@ -225,6 +297,153 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
                 self.save_model_results_to_file(self.evaluator.best_test_score,
                                                 save_perf_results_path)
 
+    def _compile_model(self, model):
+        """ Compile the model with torch.compile.
+
+        The sampled mini-batches have different shapes in every iteration, so the
+        model is compiled with dynamic shapes. The "reduce-overhead" mode is not
+        used because it would record a new CUDA graph for every new shape.
+
+        Parameters
+        ----------
+        model : torch.nn.Module
+            The model to compile.
+
+        Returns
+        -------
+        torch.nn.Module : the compiled model, or the input model if it cannot be compiled.
+        """
+        if th.__version__ < "2.0.0":
+            if self.rank == 0:
+                print("Warning: torch.compile requires PyTorch 2.0 or later. " \
+                      "Train the model in eager mode.")
+            return model
+        # pylint: disable=import-outside-toplevel
+        from torch._dynamo.eval_frame import check_if_dynamo_supported
+        try:
+            # E.g., TorchDynamo does not support some Python versions.
+            check_if_dynamo_supported()
+        except RuntimeError as err:
+            if self.rank == 0:
+                print(f"Warning: fail to compile the model ({err}). " \
+                      "Train the model in eager mode.")
+            return model
+        # The model is compiled when it runs the first mini-batch.
+        return th.compile(model, dynamic=True)
+
+    def _prepare_batch(self, data, batch, device, target_etype=None, input_ntype=None):
+        """ Move a mini-batch and its node features and labels to the device.
+
+        Parameters
+        ----------
+        data : GSgnnEdgeData
+            The training data.
+        batch : tuple
+            The input nodes, the batch graph and the blocks of a mini-batch.
+        device : torch device
+            The device of the model.
+        target_etype : tuple of str
+            The canonical edge type of the target edges. It does not change
+            across mini-batches. If None, it is read from the batch graph.
+        input_ntype : str
+            The node type of the input nodes if the data loader returns them
+            as a tensor instead of a dict. It does not change across mini-batches.
+            If None, it is read from the batch graph.
+
+        Returns
+        -------
+        tuple : the input nodes, the input node features, the labels,
+        the blocks and the batch graph.
+        """
+        input_nodes, batch_graph, blocks = batch
+        if input_ntype is not None:
+            input_nodes = {input_ntype: input_nodes}
+        elif not isinstance(input_nodes, dict):
+            assert len(batch_graph.ntypes) == 1
+            input_nodes = {batch_graph.ntypes[0]: input_nodes}
+        input_feats = data.get_node_feats(input_nodes, device)
+        # retrieving seed edge id from the graph to find labels
+        if target_etype is None:
+            # TODO(zhengda) expand code for multiple edge types
+            assert len(batch_graph.etypes) == 1
+            target_etype = batch_graph.canonical_etypes[0]
+        # TODO(zhengda) the data loader should return labels directly.
+        seeds = batch_graph.edges[target_etype].data[dgl.EID]
+        lbl = data.get_labels({target_etype: seeds}, device)
+        # The copies are non-blocking and are issued on the caller's stream.
+        blocks = [block.to(device, non_blocking=True) for block in blocks]
+        batch_graph = batch_graph.to(device, non_blocking=True)
+        return input_nodes, input_feats, lbl, blocks, batch_graph
+
+    @staticmethod
+    def _get_batch_types(batch):
+        """ Get the target edge type and the input node type of a mini-batch.
+
+        The input node type is None if the input nodes are stored in a dict.
+        """
+        input_nodes, batch_graph, _ = batch
+        input_ntype = None if isinstance(input_nodes, dict) else batch_graph.ntypes[0]
+        return batch_graph.canonical_etypes[0], input_ntype
+
+    def _prefetch_batches(self, train_loader, data, device):
+        """ Iterate over the mini-batches and prefetch the next one to the device.
+
+        On GPU, the data of the next mini-batch is moved to the device on a
+        separate CUDA stream while the current mini-batch is being computed.
+        Each mini-batch is yielded together with the time when the data loader
+        returned it and whether it is the last mini-batch of the epoch.
+
+        Parameters
+        ----------
+        train_loader : GSgnnEdgeDataLoader
+            The mini-batch sampler for training.
+        data : GSgnnEdgeData
+            The training data.
+        device : torch device
+            The device of the model.
+        """
+        # The target edge type and the type of the input nodes are the same in
+        # all the mini-batches. They are checked on the first mini-batch.
+        target_etype, input_ntype = None, None
+        if th.device(device).type != 'cuda':
+            # We look one mini-batch ahead to know which mini-batch is the last one.
+            pending = None
+            for batch in train_loader:
+                if pending is not None:
+                    yield pending[0], pending[1], False
+                batch_tic = time.time()
+                prepared = self._prepare_batch(data, batch, device, target_etype, input_ntype)
+                if target_etype is None:
+                    target_etype, input_ntype = self._get_batch_types(batch)
+                pending = (batch_tic, prepared)
+            if pending is not None:
+                yield pending[0], pending[1], True
+            return
+
+        compute_stream = th.cuda.current_stream(device)
+        copy_stream = th.cuda.Stream(device=device)
+        pending = None
+        for batch in train_loader:
+            batch_tic = time.time()
+            # The copy stream waits for the computation issued so far, so that
+            # the memory freed by the previous mini-batches can be reused safely.
+            copy_stream.wait_stream(compute_stream)
+            with th.cuda.stream(copy_stream):
+                prepared = self._prepare_batch(data, batch, device, target_etype, input_ntype)
+                ready = th.cuda.Event()
+                ready.record(copy_stream)
+            if target_etype is None:
+                target_etype, input_ntype = self._get_batch_types(batch)
+            if pending is not None:
+                # Only wait for the copy of the mini-batch to compute,
+                # not the one that is being prefetched.
+                compute_stream.wait_event(pending[2])
+                yield pending[0], pending[1], False
+            pending = (batch_tic, prepared, ready)
+        if pending is not None:
+            compute_stream.wait_event(pending[2])
+            yield pending[0], pending[1], True
+
     def eval(self, model, val_loader, test_loader, use_mini_batch_infer, total_steps):
         """ do the model evaluation using validiation and test sets
 
@@ -16,8 +16,10 @@
     GraphStorm trainer base
 """
 import os
+import time
 import psutil
 import torch as th
+from torch.nn.parallel import DistributedDataParallel
 
 from ..model import GSOptimizer
 from ..model import GSgnnModel, GSgnnModelBase
@@ -25,6 +27,55 @@ from ..model.utils import TopKList
 from ..model.utils import remove_saved_models as remove_gsgnn_models
 from ..model.utils import save_model_results_json
 
+class StepTimer():
+    """ Measure the forward and backward time of training steps.
+
+    Each training step calls `mark` three times: before the forward computation,
+    between the forward and the backward computation and after the model update.
+    On GPU, the time points are CUDA events recorded on the current stream, so
+    the timer does not synchronize with the device until `elapsed` is called.
+
+    Parameters
+    ----------
+    device : torch device
+        The device where the training runs.
+    """
+    def __init__(self, device):
+        self._use_cuda = th.device(device).type == 'cuda'
+        self._marks = []
+
+    def mark(self):
+        """ Record a time point.
+        """
+        if self._use_cuda:
+            event = th.cuda.Event(enable_timing=True)
+            event.record()
+            self._marks.append(event)
+        else:
+            self._marks.append(time.time())
+
+    def elapsed(self):
+        """ Get the total forward and backward time in seconds of the steps
+        recorded since the last call, and reset the timer.
+
+        Returns
+        -------
+        tuple of float : the forward time and the backward time.
+        """
+        forward_time = back_time = 0.
+        if self._use_cuda and len(self._marks) > 0:
+            self._marks[-1].synchronize()
+        for i in range(0, len(self._marks) - 2, 3):
+            start, mid, end = self._marks[i:i+3]
+            if self._use_cuda:
+                forward_time += start.elapsed_time(mid) / 1000
+                back_time += mid.elapsed_time(end) / 1000
+            else:
+                forward_time += mid - start
+                back_time += end - mid
+        self._marks = []
+        return forward_time, back_time
+
 class GSgnnTrainer():
     """ Generic GSgnn trainer.
 
@@ -53,6 +104,9 @@ class GSgnnTrainer():
         self._evaluator = None
         self._task_tracker = None
         self._best_model_path = None
+        # The DDP wrapper of the model and whether it was built with a static graph.
+        self._ddp_model = None
+        self._ddp_static_graph = None
 
         assert topk_model_to_save >= 0
         self._topklist = TopKList(topk_model_to_save)    # A list to store the top k best
@@ -77,6 +131,35 @@ class GSgnnTrainer():
         self._model = self._model.to(self.dev_id)
         self._optimizer.move_to_device(self._model.device)
 
+    def get_ddp_model(self, static_graph):
+        """ Get the model wrapped by DistributedDataParallel.
+
+        The wrapper is created once and reused by the following calls, so that
+        calling `fit` multiple times does not broadcast the model parameters
+        and register the DDP hooks again. It is only rebuilt if a different
+        `static_graph` setting is requested. If there is only one trainer,
+        there are no gradients to synchronize and the model is returned
+        without the wrapper.
+
+        Parameters
+        ----------
+        static_graph : bool
+            Whether the computation graph of the model changes during training.
+
+        Returns
+        -------
+        DistributedDataParallel or torch.nn.Module : the wrapped model.
+        """
+        if th.distributed.get_world_size() == 1:
+            return self._model
+        if self._ddp_model is None or self._ddp_static_graph != static_graph:
+            self._ddp_model = DistributedDataParallel(self._model, device_ids=[self.dev_id],
+                                                      output_device=self.dev_id,
+                                                      find_unused_parameters=True,
+                                                      static_graph=static_graph)
+            self._ddp_static_graph = static_graph
+        return self._ddp_model
+
     def setup_task_tracker(self, task_tracker):
         """ Set the task tracker.
 
@@ -188,11 +271,13 @@ class GSgnnTrainer():
         '''
         th.distributed.barrier()
         if save_model_path is not None:
-            assert isinstance(model.module, (GSgnnModel, GSgnnModelBase)), \
+            # The model is not wrapped by DDP if there is only one trainer.
+            model = getattr(model, 'module', model)
+            assert isinstance(model, (GSgnnModel, GSgnnModelBase)), \
                 "Please make sure the model derives from GSgnnModel or GSgnnModelBase, " \
                 "which provides a scalable model saving implementation."
             save_model_path = self._gen_model_path(save_model_path, epoch, i)
-            model.module.save_model(save_model_path)
+            model.save_model(save_model_path)
             self.optimizer.save_opt_state(save_model_path)
 
         # make sure each trainer finishes its own model saving task.
@@ -17,7 +17,6 @@
 """
 import time
 import torch as th
-from torch.nn.parallel import DistributedDataParallel
 
 from ..model.lp_gnn import GSgnnLinkPredictionModelInterface
 from ..model.lp_gnn import lp_mini_batch_predict
@@ -90,10 +89,7 @@ class GSgnnLinkPredictionTrainer(GSgnnTrainer):
                     "Only GSgnnModel supports full-graph inference."
         # with freeze_input_layer_epochs is 0, computation graph will not be changed.
         static_graph = freeze_input_layer_epochs == 0
-        model = DistributedDataParallel(self._model, device_ids=[self.dev_id],
-                                        output_device=self.dev_id,
-                                        find_unused_parameters=True,
-                                        static_graph=static_graph)
+        model = self.get_ddp_model(static_graph)
         device = model.device
         data = train_loader.data
 
@@ -157,7 +153,7 @@ class GSgnnLinkPredictionTrainer(GSgnnTrainer):
                 val_score = None
                 if self.evaluator is not None and \
                     self.evaluator.do_eval(total_steps, epoch_end=False):
-                    val_score = self.eval(model.module, data,
+                    val_score = self.eval(self._model, data,
                                           val_loader, test_loader, total_steps,
                                           edge_mask_for_gnn_embeddings)
 
@@ -192,7 +188,7 @@ class GSgnnLinkPredictionTrainer(GSgnnTrainer):
 
             val_score = None
             if self.evaluator is not None and self.evaluator.do_eval(total_steps, epoch_end=True):
-                val_score = self.eval(model.module, data,
+                val_score = self.eval(self._model, data,
                                       val_loader, test_loader, total_steps,
                                       edge_mask_for_gnn_embeddings)
 
@@ -17,7 +17,6 @@
 """
 import time
 import torch as th
-from torch.nn.parallel import DistributedDataParallel
 
 from ..model.node_gnn import node_mini_batch_gnn_predict, node_mini_batch_predict
 from ..model.node_gnn import GSgnnNodeModelInterface
@@ -87,10 +86,7 @@ class GSgnnNodePredictionTrainer(GSgnnTrainer):
 
         # with freeze_input_layer_epochs is 0, computation graph will not be changed.
         static_graph = freeze_input_layer_epochs == 0
-        model = DistributedDataParallel(self._model, device_ids=[self.dev_id],
-                                        output_device=self.dev_id,
-                                        find_unused_parameters=True,
-                                        static_graph=static_graph)
+        model = self.get_ddp_model(static_graph)
         device = model.device
         data = train_loader.data
 
@@ -153,7 +149,7 @@ class GSgnnNodePredictionTrainer(GSgnnTrainer):
                 if self.evaluator is not None and \
                     self.evaluator.do_eval(total_steps, epoch_end=False) and \
                     val_loader is not None:
-                    val_score = self.eval(model.module, val_loader, test_loader,
+                    val_score = self.eval(self._model, val_loader, test_loader,
                                           use_mini_batch_infer, total_steps)
 
                     if self.evaluator.do_early_stop(val_score):
@@ -186,7 +182,7 @@ class GSgnnNodePredictionTrainer(GSgnnTrainer):
 
             val_score = None
             if self.evaluator is not None and self.evaluator.do_eval(total_steps, epoch_end=True):
-                val_score = self.eval(model.module, val_loader, test_loader,
+                val_score = self.eval(self._model, val_loader, test_loader,
                                       use_mini_batch_infer, total_steps)
                 if self.evaluator.do_early_stop(val_score):
                     early_stop = True
@@ -34,8 +34,7 @@ class MyGNNModel(gsmodel.GSgnnNodeModelBase):
         self._loss_fn = gsmodel.ClassifyLossFunc(multilabel=False)
 
     def forward(self, blocks, node_feats, _, labels, input_nodes=None):
-        input_nodes = {ntype: blocks[0].srcnodes[ntype].data[dgl.NID].cpu() \
-                for ntype in blocks[0].srctypes}
+        input_nodes = self._get_input_nodes(blocks, input_nodes)
         embs = self._node_input(node_feats, input_nodes)
         embs = self._gnn(blocks, embs)
         target_ntype = list(labels.keys())[0]
@@ -53,16 +52,26 @@ class MyGNNModel(gsmodel.GSgnnNodeModelBase):
         total_loss = pred_loss + reg_loss
         return total_loss
 
-    def predict(self, blocks, node_feats, _):
-        input_nodes = {ntype: blocks[0].srcnodes[ntype].data[dgl.NID].cpu() \
-                for ntype in blocks[0].srctypes}
+    def predict(self, blocks, node_feats, _, input_nodes=None):
+        input_nodes = self._get_input_nodes(blocks, input_nodes)
         device = blocks[0].device
         embs = self._node_input(node_feats, input_nodes)
         embs = {name: emb.to(device) for name, emb in embs.items()}
         embs = self._gnn(blocks, embs)
         assert len(embs) == 1
         emb = list(embs.values())[0]
-        return self._decoder.predict(emb)
+        return self._decoder.predict(emb), emb
+
+    @staticmethod
+    def _get_input_nodes(blocks, input_nodes):
+        # The data loader provides the input node IDs on CPU, which is where
+        # the sparse embeddings are looked up. Only fall back to reading them
+        # from the blocks, which requires a device to host copy, if they are
+        # not provided.
+        if input_nodes is not None:
+            return input_nodes
+        return {ntype: blocks[0].srcnodes[ntype].data[dgl.NID].cpu() \
+                for ntype in blocks[0].srctypes}
 
     def restore_model(self, restore_model_path):
         pass
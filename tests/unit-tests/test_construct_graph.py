@@ -58,6 +58,12 @@ def test_parquet():
     except:
         pass
 
+    # Test string data with duplicated values.
+    data = {"data1": np.array([str(i % 3) for i in range(10)])}
+    write_data_parquet(data, tmpfile)
+    data1 = read_data_parquet(tmpfile)
+    np.testing.assert_array_equal(data1['data1'], data['data1'])
+
     os.remove(tmpfile)
 
 def test_json():
@@ -410,6 +416,34 @@ def test_id_map():
     check_id_map_not_exist(id_map, str_ids)
     check_id_map_dtype_not_match(id_map, str_ids)
 
+    # Test the ID map with duplicated string keys.
+    id_map = IdMap(np.array(["a", "b", "a", "c"]))
+    assert len(id_map) == 3
+    remap_ids, idx = id_map.map_id(np.array(["c", "d", "a", "b"]))
+    np.testing.assert_array_equal(remap_ids, np.array([3, 2, 1]))
+    np.testing.assert_array_equal(idx, np.array([0, 2, 3]))
+
+    # Test the ID map with integer keys.
+    int_ids = np.random.permutation(100) * 2
+    id_map = IdMap(int_ids)
+    assert len(id_map) == len(int_ids)
+    rand_ids = np.concatenate([np.random.choice(int_ids, 20), np.array([1, 3, 1000])])
+    remap_ids, idx = id_map.map_id(rand_ids)
+    np.testing.assert_array_equal(idx, np.arange(20))
+    assert np.issubdtype(remap_ids.dtype, np.integer)
+    np.testing.assert_array_equal(int_ids[remap_ids], rand_ids[:20])
+    keys, vals = id_map.get_key_vals()
+    np.testing.assert_array_equal(keys, int_ids)
+    np.testing.assert_array_equal(vals, np.arange(len(int_ids)))
+
+    # Test the ID map with dense integer keys.
+    int_ids = np.random.permutation(100) + 10
+    id_map = IdMap(int_ids)
+    rand_ids = np.concatenate([np.random.choice(int_ids, 20), np.array([0, 9, 110, 1000])])
+    remap_ids, idx = id_map.map_id(rand_ids)
+    np.testing.assert_array_equal(idx, np.arange(20))
+    np.testing.assert_array_equal(int_ids[remap_ids], rand_ids[:20])
+
 def check_map_node_ids_exist(str_src_ids, str_dst_ids, id_map):
     # Test the case that both source node IDs and destination node IDs exist.
     src_ids = np.array([str(random.randint(0, len(str_src_ids) - 1)) for _ in range(15)])
@@ -507,6 +541,12 @@ def test_merge_arrays():
         assert isinstance(em_arr, np.ndarray)
         np.testing.assert_array_equal(np.concatenate([data1, data2]), em_arr)
 
+        # The input arrays are released once they are merged.
+        arrs = [data1, data2]
+        em_arr = converter(arrs, "test3.5")
+        assert all(arr is None for arr in arrs)
+        np.testing.assert_array_equal(np.concatenate([data1, data2]), em_arr)
+
         # Input is an array whose feature dimension is larger than 2.
         data1 = np.random.uniform(size=(1000, 10))
         em_arr = converter([data1], "test4")
@@ -17,7 +17,18 @@
 """
 
 import os
+import tempfile
+import numpy as np
+from numpy.testing import assert_equal
+import torch as th
+import dgl
 from graphstorm.data import MovieLens100kNCDataset
+from graphstorm.data import generated_train_valid_test_splits
+from graphstorm.data.utils import parse_category_single_feat
+from graphstorm.data.utils import adjust_eval_mapping_for_partition
+from graphstorm.data.utils import add_reverse_edges, return_reverse_mappings
+from graphstorm.data.utils import get_id, get_ids_batch
+from graphstorm.data.utils import read_text_lines
 
 
 def test_moveliens100k_dataset_normal():
@@ -60,6 +71,203 @@ def test_moveliens100k_dataset_normal():
                                       \"ml-100k.bin\" saved at {dataset_config['save_path']}, \
                                       but not."
 
+def test_parse_category_single_feat():
+    feats, classes = parse_category_single_feat(['A', 'B', 'C', 'A'])
+    assert_equal(classes, np.array(['A', 'B', 'C']))
+    assert_equal(feats, np.array([[1., 0., 0.], [0., 1., 0.], [0., 0., 1.], [1., 0., 0.]]))
+    # Every call returns its own arrays.
+    feats2, _ = parse_category_single_feat(['A', 'B', 'C', 'A'])
+    feats2[0, 0] = 0.
+    assert feats[0, 0] == 1.
+
+    # Two categories still generate a two-column onehot encoding.
+    feats, classes = parse_category_single_feat(['M', 'F', 'M'])
+    assert_equal(classes, np.array(['F', 'M']))
+    assert_equal(feats, np.array([[0., 1.], [1., 0.], [0., 1.]]))
+
+    # Categories that are not in the predefined classes get all-zero rows.
+    feats, classes = parse_category_single_feat(['A', 'D', 'B'], classes=['C', 'B', 'A'])
+    assert_equal(classes, np.array(['A', 'B', 'C']))
+    assert_equal(feats, np.array([[1., 0., 0.], [0., 0., 0.], [0., 1., 0.]]))
+    # With two predefined classes, an unseen category is encoded as the first class
+    # if the inputs are binary. Otherwise, it gets an all-zero row.
+    feats, classes = parse_category_single_feat(['M', 'X', 'M'], classes=['M', 'F'])
+    assert_equal(classes, np.array(['F', 'M']))
+    assert_equal(feats, np.array([[0., 1.], [1., 0.], [0., 1.]]))
+    feats, classes = parse_category_single_feat(['M', 'X', 'F'], classes=['M', 'F'])
+    assert_equal(feats, np.array([[0., 1.], [0., 0.], [1., 0.]]))
+    # An unseen category that sorts between the two classes.
+    feats, classes = parse_category_single_feat(['M', 'G', 'M'], classes=['M', 'F'])
+    assert_equal(feats, np.array([[0., 1.], [1., 0.], [0., 1.]]))
+    feats, classes = parse_category_single_feat(['G', 'G'], classes=['M', 'F'])
+    assert_equal(feats, np.array([[1., 0.], [1., 0.]]))
+    # With one predefined class, binary inputs are all encoded as the first column.
+    # Otherwise, only the inputs of the class are encoded as the second column.
+    feats, classes = parse_category_single_feat(['M', 'X', 'M'], classes=['M'])
+    assert_equal(classes, np.array(['M']))
+    assert_equal(feats, np.array([[1., 0.], [1., 0.], [1., 0.]]))
+    feats, classes = parse_category_single_feat(['M', 'X', 'A'], classes=['M'])
+    assert_equal(feats, np.array([[0., 1.], [1., 0.], [1., 0.]]))
+    # A single category still generates a two-column onehot encoding.
+    feats, classes = parse_category_single_feat(['M', 'M'])
+    assert_equal(feats, np.array([[1., 0.], [1., 0.]]))
+
+    # The cached class list is not modified by the callers.
+    _, classes = parse_category_single_feat(['A'], classes=['C', 'B', 'A'])
+    classes[0] = 'Z'
+    _, classes = parse_category_single_feat(['A'], classes=['C', 'B', 'A'])
+    assert_equal(classes, np.array(['A', 'B', 'C']))
+
+def test_generated_train_valid_test_splits():
+    g = dgl.heterograph({
+        ('n0', 'r0', 'n1'): (th.randint(0, 10, (100,)), th.randint(0, 10, (100,))),
+        ('n0', 'r1', 'n0'): (th.randint(0, 10, (50,)), th.randint(0, 10, (50,))),
+    })
+    train_eids, val_eids, test_eids, train_mask, val_mask, test_mask = \
+        generated_train_valid_test_splits(g, 0.8, 0.1, 0.1, seed=0)
+    for etype in g.canonical_etypes:
+        num_edges = g.number_of_edges(etype)
+        assert len(train_eids[etype]) == int(0.8 * num_edges)
+        assert len(val_eids[etype]) == int(0.9 * num_edges) - int(0.8 * num_edges)
+        all_eids = th.cat([train_eids[etype], val_eids[etype], test_eids[etype]])
+        assert train_mask[etype].dtype == th.bool
+        assert len(th.unique(all_eids)) == len(all_eids)
+        # Each mask contains the edges of the previous splits.
+        assert_equal(th.nonzero(train_mask[etype]).squeeze(1).numpy(),
+                     np.sort(train_eids[etype].numpy()))
+        assert_equal(th.nonzero(val_mask[etype]).squeeze(1).numpy(),
+                     np.sort(th.cat([train_eids[etype], val_eids[etype]]).numpy()))
+        assert_equal(th.nonzero(test_mask[etype]).squeeze(1).numpy(),
+                     np.sort(all_eids.numpy()))
+
+    # The same seed generates the same splits.
+    train_eids2, _, _, _, _, _ = generated_train_valid_test_splits(g, 0.8, 0.1, 0.1, seed=0)
+    for etype in g.canonical_etypes:
+        assert_equal(train_eids[etype].numpy(), train_eids2[etype].numpy())
+
+    # Without a seed, the splits follow the global random state.
+    th.manual_seed(1)
+    train_eids1, _, _, _, _, _ = generated_train_valid_test_splits(g, 0.8, 0.1, 0.1)
+    th.manual_seed(1)
+    train_eids2, _, _, _, _, _ = generated_train_valid_test_splits(g, 0.8, 0.1, 0.1)
+    for etype in g.canonical_etypes:
+        assert_equal(train_eids1[etype].numpy(), train_eids2[etype].numpy())
+
+    _, _, _, train_mask, val_mask, test_mask = \
+        generated_train_valid_test_splits(g, 0.8, 0.1, 0.1,
+                                          use_non_selected_edges=True, seed=0)
+    for etype in g.canonical_etypes:
+        num_edges = g.number_of_edges(etype)
+        assert_equal(th.nonzero(train_mask[etype]).squeeze(1).numpy(),
+                     np.sort(train_eids[etype].numpy()))
+        assert th.count_nonzero(test_mask[etype]) == num_edges
+
+    train_eids2, _, _, train_mask, val_mask, test_mask = \
+        generated_train_valid_test_splits(g, 0.8, 0.1, 0.1, seed=0, need_masks=False)
+    assert len(train_mask) == 0 and len(val_mask) == 0 and len(test_mask) == 0
+    for etype in g.canonical_etypes:
+        assert_equal(train_eids[etype].numpy(), train_eids2[etype].numpy())
+
+    train_eids2, val_eids2, _, train_mask, _, _ = \
+        generated_train_valid_test_splits(g, 0.8, 0.1, 0.1, seed=0, share_memory=True)
+    for etype in g.canonical_etypes:
+        assert train_eids2[etype].is_shared()
+        assert val_eids2[etype].is_shared()
+        assert train_mask[etype].is_shared()
+        assert_equal(train_eids[etype].numpy(), train_eids2[etype].numpy())
+
+def test_adjust_eval_mapping_for_partition():
+    original_idx = th.randperm(1000)[:300]
+    eval_idx = np.random.permutation(1000)[:200]
+    eval_text = [str(i) for i in eval_idx]
+    x_ind, texts = adjust_eval_mapping_for_partition(original_idx, eval_idx, eval_text)
+    _, exp_x_ind, exp_y_ind = np.intersect1d(original_idx.numpy(), eval_idx,
+                                             assume_unique=True, return_indices=True)
+    assert_equal(x_ind.numpy(), exp_x_ind)
+    assert texts == [eval_text[i] for i in exp_y_ind]
+    assert_equal(original_idx[x_ind].numpy(), np.array(texts, dtype=np.int64))
+
+    # No overlap between the partition and the eval set.
+    x_ind, texts = adjust_eval_mapping_for_partition(th.arange(10), [20, 30], ["a", "b"])
+    assert len(x_ind) == 0
+    assert len(texts) == 0
+
+def test_add_reverse_edges():
+    src = th.arange(10)
+    dst = th.arange(10, 20)
+    graph_edges = {("n0", "r0", "n1"): (src, dst),
+                   ("n1", "r1", "n1"): th.stack([dst, src])}
+    new_graph_edges = add_reverse_edges(graph_edges)
+    assert len(new_graph_edges) == 4
+    assert new_graph_edges[("n0", "r0", "n1")] is graph_edges[("n0", "r0", "n1")]
+    rev_src, rev_dst = new_graph_edges[("n1", "rev-r0", "n0")]
+    assert_equal(rev_src.numpy(), dst.numpy())
+    assert_equal(rev_dst.numpy(), src.numpy())
+    rev_src, rev_dst = new_graph_edges[("n1", "rev-r1", "n1")]
+    assert_equal(rev_src.numpy(), src.numpy())
+    assert_equal(rev_dst.numpy(), dst.numpy())
+    # The reversed edges share the storage with the original edges.
+    assert rev_src.data_ptr() == graph_edges[("n1", "r1", "n1")][1].data_ptr()
+
+def test_return_reverse_mappings():
+    g = dgl.heterograph({
+        ('n0', 'r0', 'n1'): (th.randint(0, 10, (100,)), th.randint(0, 10, (100,))),
+        ('n0', 'r1', 'n0'): (th.randint(0, 10, (50,)), th.randint(0, 10, (50,))),
+    })
+    reverse_eids = return_reverse_mappings(['r0', 'r1'], g)
+    assert_equal(reverse_eids[('n0', 'r0', 'n1')].numpy(), np.arange(100))
+    assert_equal(reverse_eids[('n0', 'r1', 'n0')].numpy(), np.arange(50))
+    assert len(return_reverse_mappings([], g)) == 0
+
+def test_get_ids_batch():
+    keys = ["c", "a", "c", "b", "a", "d"]
+    nid_dict = {"b": 0}
+    ids, is_new = get_ids_batch(nid_dict, keys)
+    exp_dict = {"b": 0}
+    exp = [get_id(exp_dict, key) for key in keys]
+    assert_equal(ids, np.array([nid for nid, _ in exp]))
+    assert_equal(is_new, np.array([new for _, new in exp]))
+    assert nid_dict == exp_dict
+
+    # Integer raw ids.
+    nid_dict = {}
+    ids, is_new = get_ids_batch(nid_dict, np.array([10, 5, 10, 7]))
+    assert_equal(ids, np.array([0, 1, 0, 2]))
+    assert_equal(is_new, np.array([True, True, False, True]))
+    assert nid_dict == {10: 0, 5: 1, 7: 2}
+
+    # Raw ids of very different lengths.
+    long_key = "x" * 100000
+    nid_dict = {}
+    ids, is_new = get_ids_batch(nid_dict, ["a", long_key, "a"])
+    assert_equal(ids, np.array([0, 1, 0]))
+    assert_equal(is_new, np.array([True, True, False]))
+    assert nid_dict == {"a": 0, long_key: 1}
+
+def test_read_text_lines():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        path = os.path.join(tmpdirname, "text.txt")
+        lines = ["hello world", "", "naïve text", "last line"]
+        with open(path, "w", encoding="utf-8") as fout:
+            fout.write("\n".join(lines) + "\n")
+        assert read_text_lines(path) == lines
+        assert read_text_lines(path, encoding=None) == [line.encode("utf-8") for line in lines]
+
+        # The last line doesn't need to end with a line break.
+        with open(path, "w", encoding="utf-8", newline="") as fout:
+            fout.write("\r\n".join(lines))
+        assert read_text_lines(path) == lines
+
+        empty_path = os.path.join(tmpdirname, "empty.txt")
+        open(empty_path, "w", encoding="utf-8").close()
+        assert read_text_lines(empty_path) == []
 
 if __name__ == "__main__":
     test_moveliens100k_dataset_normal()
+    test_parse_category_single_feat()
+    test_generated_train_valid_test_splits()
+    test_adjust_eval_mapping_for_partition()
+    test_add_reverse_edges()
+    test_return_reverse_mappings()
+    test_get_ids_batch()
+    test_read_text_lines()
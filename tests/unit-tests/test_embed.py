@@ -17,7 +17,6 @@
 import pytest
 import torch as th
 from torch import nn
-import numpy as np
 from numpy.testing import assert_almost_equal, assert_raises
 import tempfile
 
@@ -49,14 +48,15 @@ def test_input_layer1():
     layer = GSNodeEncoderInputLayer(g, feat_size, 2)
     ntypes = list(layer.input_projs.keys())
     assert set(ntypes) == set(g.ntypes)
-    node_feat = {}
-    input_nodes = {}
-    for ntype in ntypes:
-        # We make the projection matrix a diagonal matrix so that
-        # the input and output matrices are identical.
-        nn.init.eye_(layer.input_projs[ntype])
-        input_nodes[ntype] = np.arange(10)
-        node_feat[ntype] = g.nodes[ntype].data['feat'][input_nodes[ntype]]
+    # We make the projection matrices diagonal matrices so that
+    # the input and output matrices are identical.
+    with th.no_grad():
+        for proj in layer.input_projs.values():
+            proj.copy_(th.eye(*proj.shape))
+    # All the node types share the same input node IDs.
+    idx = th.arange(10)
+    input_nodes = {ntype: idx for ntype in ntypes}
+    node_feat = prepare_batch_input(g, input_nodes, feat_field='feat')
     embed = layer(node_feat, input_nodes)
     assert len(embed) == len(input_nodes)
     assert len(embed) == len(node_feat)
@@ -82,22 +82,21 @@ def test_input_layer2():
     assert set(layer.input_projs.keys()) == set(g.ntypes)
     assert set(layer.sparse_embeds.keys()) == set(g.ntypes)
     assert set(layer.proj_matrix.keys()) == set(g.ntypes)
-    node_feat = {}
-    node_embs = {}
-    input_nodes = {}
-    for ntype in g.ntypes:
-        # We make the projection matrix a diagonal matrix so that
-        # the input and output matrices are identical.
-        nn.init.eye_(layer.input_projs[ntype])
-        assert layer.proj_matrix[ntype].shape == (4, 2)
-        # We make the projection matrix that can simply add the node features
-        # and the node sparse embeddings after projection.
-        with th.no_grad():
-            layer.proj_matrix[ntype][:2,:] = layer.input_projs[ntype]
-            layer.proj_matrix[ntype][2:,:] = layer.input_projs[ntype]
-        input_nodes[ntype] = np.arange(10)
-        node_feat[ntype] = g.nodes[ntype].data['feat'][input_nodes[ntype]]
-        node_embs[ntype] = layer.sparse_embeds[ntype].weight[input_nodes[ntype]]
+    # All the node types share the same input node IDs.
+    idx = th.arange(10)
+    input_nodes = {ntype: idx for ntype in g.ntypes}
+    with th.no_grad():
+        for ntype, proj in layer.input_projs.items():
+            # We make the projection matrix a diagonal matrix so that
+            # the input and output matrices are identical.
+            proj.copy_(th.eye(*proj.shape))
+            assert layer.proj_matrix[ntype].shape == (4, 2)
+            # We make the projection matrix that can simply add the node features
+            # and the node sparse embeddings after projection.
+            layer.proj_matrix[ntype][:2,:] = proj
+            layer.proj_matrix[ntype][2:,:] = proj
+    node_feat = prepare_batch_input(g, input_nodes, feat_field='feat')
+    node_embs = {ntype: layer.sparse_embeds[ntype].weight[idx] for ntype in g.ntypes}
     embed = layer(node_feat, input_nodes)
     assert len(embed) == len(input_nodes)
     assert len(embed) == len(node_feat)
@@ -129,9 +128,8 @@ def test_input_layer3(dev):
 
     node_feat = {}
     node_embs = {}
-    input_nodes = {}
-    for ntype in g.ntypes:
-        input_nodes[ntype] = np.arange(10)
+    idx = th.arange(10)
+    input_nodes = {ntype: idx for ntype in g.ntypes}
     nn.init.eye_(layer.input_projs['n0'])
     nn.init.eye_(layer.proj_matrix['n1'])
     node_feat['n0'] = g.nodes['n0'].data['feat'][input_nodes['n0']].to(dev)
@@ -145,6 +143,11 @@ def test_input_layer3(dev):
                         node_feat['n0'].detach().cpu().numpy())
     assert_almost_equal(embed['n1'].detach().cpu().numpy(),
                         node_embs['n1'].detach().cpu().numpy())
+    # The input node IDs can also be NumPy arrays.
+    embed_np = layer(node_feat, {ntype: nids.numpy() for ntype, nids in input_nodes.items()})
+    for ntype in embed:
+        assert_almost_equal(embed_np[ntype].detach().cpu().numpy(),
+                            embed[ntype].detach().cpu().numpy())
 
     # Test the case with errors.
     try:
@@ -154,8 +157,8 @@ def test_input_layer3(dev):
     assert embed is None
 
     # test the case that one node type has no input nodes.
-    input_nodes['n0'] = np.arange(10)
-    input_nodes['n1'] = np.zeros((0,))
+    input_nodes['n0'] = idx
+    input_nodes['n1'] = th.zeros((0,), dtype=th.int64)
     nn.init.eye_(layer.input_projs['n0'])
     node_feat['n0'] = g.nodes['n0'].data['feat'][input_nodes['n0']].to(dev)
     node_embs['n1'] = layer.sparse_embeds['n1'].weight[input_nodes['n1']]
@@ -0,0 +1,117 @@
+"""
+    Copyright 2023 Contributors
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+import pytest
+import torch as th
+from torch import nn
+from torch.nn.parallel import DistributedDataParallel
+import torch.multiprocessing as mp
+from numpy.testing import assert_almost_equal
+
+import dgl
+
+from graphstorm.model.gnn import GSgnnModelBase, GSOptimizer
+from graphstorm.model.edge_gnn import GSgnnEdgeModelInterface
+from graphstorm.trainer import GSgnnEdgePredictionTrainer
+
+class DummyEdgeModel(GSgnnModelBase, GSgnnEdgeModelInterface):
+    """ An edge model whose loss is the mean of the projected node features.
+    """
+    def __init__(self):
+        super(DummyEdgeModel, self).__init__()
+        self.weight = nn.Parameter(th.ones(2, 1))
+        # A parameter that is not used in training.
+        self.unused = nn.Parameter(th.ones(2, 1))
+
+    def forward(self, blocks, batch_graph, node_feats, edge_feats,
+        labels, input_nodes=None):
+        return (node_feats['n'] @ self.weight).mean()
+
+    def predict(self, blocks, batch_graph, node_feats, edge_feats, input_nodes):
+        return None
+
+    def restore_model(self, restore_model_path):
+        pass
+
+    def save_model(self, model_path):
+        pass
+
+    def create_optimizer(self):
+        return GSOptimizer([th.optim.SGD(self.parameters(), lr=0.1)])
+
+class DummyEdgeData:
+    """ The node features of a trainer are all equal to its rank + 1.
+    """
+    def __init__(self, rank):
+        self._rank = rank
+
+    def get_node_feats(self, input_nodes, device):
+        return {ntype: th.full((len(nodes), 2), self._rank + 1.) \
+                for ntype, nodes in input_nodes.items()}
+
+    def get_labels(self, seeds, device):
+        return None
+
+class DummyEdgeLoader:
+    def __init__(self, rank, num_batches):
+        self.data = DummyEdgeData(rank)
+        self._num_batches = num_batches
+
+    def __iter__(self):
+        for _ in range(self._num_batches):
+            batch_graph = dgl.heterograph({('n', 'r', 'n'): (th.arange(3), th.arange(3))})
+            batch_graph.edata[dgl.EID] = th.arange(3)
+            yield th.arange(4), batch_graph, []
+
+def run_ep_fit_grad_accum(worker_rank, world_size, num_batches, grad_accum_steps,
+                          target_weight):
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23457',
+                                      world_size=world_size,
+                                      rank=worker_rank)
+    model = DummyEdgeModel()
+    trainer = GSgnnEdgePredictionTrainer(model, worker_rank, topk_model_to_save=1)
+    # Wrap the CPU model in DDP in the same way as the trainer does on GPU.
+    trainer.get_ddp_model = lambda static_graph: DistributedDataParallel(
+        model, find_unused_parameters=True, static_graph=static_graph)
+    trainer.fit(DummyEdgeLoader(worker_rank, num_batches), num_epochs=2,
+                save_model_frequency=0, grad_accum_steps=grad_accum_steps)
+    assert_almost_equal(model.weight.detach().numpy(), target_weight, decimal=5)
+    assert_almost_equal(model.unused.detach().numpy(), th.ones(2, 1).numpy())
+    th.distributed.destroy_process_group()
+
+@pytest.mark.parametrize("num_batches,grad_accum_steps", [(4, 1), (4, 2), (5, 2), (5, 3)])
+def test_ep_fit_grad_accum(num_batches, grad_accum_steps):
+    """ Test gradient accumulation of edge prediction training with DDP.
+
+        The gradients of the two trainers are 1 and 2 in every iteration.
+        Each update of the model averages them, including the last update
+        of an epoch that accumulates fewer iterations.
+    """
+    world_size = 2
+    num_updates = 2 * ((num_batches + grad_accum_steps - 1) // grad_accum_steps)
+    target_weight = (th.ones(2, 1) - num_updates * 0.1 * 1.5).numpy()
+    ctx = mp.get_context('spawn')
+    workers = [ctx.Process(target=run_ep_fit_grad_accum,
+                           args=(rank, world_size, num_batches, grad_accum_steps,
+                                 target_weight)) for rank in range(world_size)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+if __name__ == '__main__':
+    test_ep_fit_grad_accum(5, 2)
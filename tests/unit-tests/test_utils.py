@@ -25,7 +25,7 @@ import numpy as np
 from numpy.testing import assert_equal
 from graphstorm.model.utils import save_embeddings, LazyDistTensor, remove_saved_models, TopKList
 from graphstorm.model.utils import _get_data_range
-from graphstorm.model.utils import _exchange_node_id_mapping
+from graphstorm.model.utils import _exchange_node_id_mapping, _load_id_mapping
 from graphstorm.gconstruct.utils import _save_maps
 from graphstorm import get_feat_size
 
@@ -242,6 +242,20 @@ def test_save_embeddings_with_id_mapping(num_embs, backend):
         assert len(saved_emb) == len(embs['n2'])
         assert_equal(embs['n2'][nid_mappings['n2']].numpy(), saved_emb.numpy())
 
+def test_load_id_mapping():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        nid_mapping = th.randperm(100)
+        _save_maps(tmpdirname, "node_mapping", nid_mapping)
+        loaded = _load_id_mapping(os.path.join(tmpdirname, "node_mapping.pt"))
+        assert_equal(nid_mapping.numpy(), loaded.numpy())
+
+        nid_mappings = {"n0": th.randperm(10), "n1": th.randperm(20)}
+        _save_maps(tmpdirname, "node_mapping", nid_mappings)
+        loaded = _load_id_mapping(os.path.join(tmpdirname, "node_mapping.pt"))
+        assert set(loaded.keys()) == set(nid_mappings.keys())
+        for ntype, mapping in nid_mappings.items():
+            assert_equal(mapping.numpy(), loaded[ntype].numpy())
+
 def test_save_embeddings():
     # initialize the torch distributed environment
     th.distributed.init_process_group(backend='gloo',
@@ -360,6 +374,7 @@ def test_gen_mrr_score():
 
 if __name__ == '__main__':
     test_get_data_range()
+    test_load_id_mapping()
     test_exchange_node_id_mapping(100, backend='gloo')
     test_exchange_node_id_mapping(101, backend='nccl')
     test_save_embeddings_with_id_mapping(num_embs=16, backend='gloo')